@@ -0,0 +1,31 @@
+from functools import wraps
+from django.http import JsonResponse
+from rest_framework.authtoken.models import Token
+
+
+def async_token_required(view):
+    """
+    Authenticate an async view with a DRF token ("Authorization: Token <key>").
+
+    DRF views are synchronous, so async views use this instead of TokenAuthentication
+    and IsAuthenticated. The token lookup uses the async ORM, and request.user is set
+    with its team already loaded.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        auth = request.headers.get('Authorization', '').split()
+        if len(auth) != 2 or auth[0].lower() != 'token':
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        try:
+            token = await Token.objects.select_related('user', 'user__team').aget(key=auth[1])
+        except Token.DoesNotExist:
+            return JsonResponse({'detail': 'Invalid token.'}, status=401)
+
+        if not token.user.is_active:
+            return JsonResponse({'detail': 'User inactive or deleted.'}, status=401)
+
+        request.user = token.user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
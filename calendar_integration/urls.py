@@ -7,4 +7,8 @@ urlpatterns = [
     path('auth-url/', views.get_auth_url, name='get_auth_url'),
     path('callback/', views.handle_callback, name='handle_callback'),
     path('meetings/', views.get_upcoming_meetings, name='get_upcoming_meetings'),
+    # Async variants, for deployments served by an ASGI server (engine.asgi)
+    path('async/auth-url/', views.get_auth_url_async, name='get_auth_url_async'),
+    path('async/callback/', views.handle_callback_async, name='handle_callback_async'),
+    path('async/meetings/', views.get_upcoming_meetings_async, name='get_upcoming_meetings_async'),
 ]
\ No newline at end of file
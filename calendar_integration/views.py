@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.http import JsonResponse
 from rest_framework.response import Response
@@ -6,6 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from .models import CalendarConnection
 from .services import MicrosoftCalendarService
+from authentication.decorators import async_token_required
 from django.urls import reverse
 from rest_framework import status
 
@@ -76,4 +78,71 @@ def get_upcoming_meetings(request):
 
         return JsonResponse({'meetings': meetings})
     except CalendarConnection.DoesNotExist:
-        return JsonResponse({'error': 'Calendar not connected'}, status=404)
\ No newline at end of file
+        return JsonResponse({'error': 'Calendar not connected'}, status=404)
+
+
+# Async variants for ASGI servers. O365 has no async client, so each Graph/OAuth call runs
+# through sync_to_async, off the event loop. The calls load and save tokens through
+# DjangoTokenBackend, so they stay thread-sensitive: Django then manages their database
+# connections, at the cost of running one such call at a time.
+
+@async_token_required
+async def get_auth_url_async(request):
+    """Async version of get_auth_url."""
+    calendar_service = MicrosoftCalendarService(request.user)
+    state = str(request.user.id)
+
+    auth_url, flow = await sync_to_async(calendar_service.get_authorization_url)()
+    if flow is None:
+        return JsonResponse({'message': "Flow is None"})
+
+    auth_url = auth_url.replace(f'state={flow["state"]}', f'state={state}')
+    flow['state'] = state
+    flow['auth_uri'] = auth_url
+    # Store flow in CalendarConnection
+    await CalendarConnection.objects.aupdate_or_create(
+        user=request.user,
+        defaults={'flow': flow}
+    )
+
+    return JsonResponse({'auth_url': auth_url, 'flow': str(flow)})
+
+
+async def handle_callback_async(request):
+    """Async version of handle_callback."""
+    code = request.GET.get('code')
+    state = request.GET.get('state')
+
+    if not code or not state:
+        return JsonResponse({'error': 'No code or state provided'}, status=400)
+
+    try:
+        connection = await CalendarConnection.objects.select_related('user').aget(user_id=state)
+    except (CalendarConnection.DoesNotExist, ValueError):
+        return JsonResponse({'error': 'Invalid state parameter or no flow found'}, status=400)
+
+    calendar_service = MicrosoftCalendarService(connection.user)
+
+    # Build full redirect URL from request (including code and state)
+    redirect_response_url = request.build_absolute_uri()
+
+    success = await sync_to_async(calendar_service.get_tokens_from_code)(
+        connection.flow, redirect_response_url
+    )
+
+    if success:
+        return JsonResponse({"status": 'success'}, status=status.HTTP_200_OK)
+    else:
+        return JsonResponse({"status": 'failure'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@async_token_required
+async def get_upcoming_meetings_async(request):
+    """Async version of get_upcoming_meetings."""
+    try:
+        calendar_service = MicrosoftCalendarService(request.user)
+        meetings = await sync_to_async(calendar_service.get_upcoming_meetings)()
+
+        return JsonResponse({'meetings': meetings})
+    except CalendarConnection.DoesNotExist:
+        return JsonResponse({'error': 'Calendar not connected'}, status=404)
@@ -50,9 +50,17 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL', 'redis://localhost:6379/1'),
+    }
+}
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_RESULT_BACKEND = 'django-db'
 
@@ -87,6 +95,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'engine.wsgi.application'
+ASGI_APPLICATION = 'engine.asgi.application'
 
 
 # Database
@@ -176,4 +185,92 @@ REST_FRAMEWORK = {
 
 MS_CLIENT_ID = os.getenv('MS_CLIENT_ID', '')
 MS_CLIENT_SECRET = os.getenv('MS_CLIENT_SECRET', '')
-MS_REDIRECT_URI = os.getenv('MS_REDIRECT_URI', '')
\ No newline at end of file
+MS_REDIRECT_URI = os.getenv('MS_REDIRECT_URI', '')
+
+
+# Transcription settings
+# Speech-to-text engine: 'openai' (Whisper API) or 'local' (faster-whisper on the worker CPU)
+TRANSCRIPTION_BACKEND = os.getenv('TRANSCRIPTION_BACKEND', 'openai')
+LOCAL_WHISPER_MODEL = os.getenv('LOCAL_WHISPER_MODEL', 'large-v3')
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv('LOCAL_WHISPER_COMPUTE_TYPE', 'int8')
+LOCAL_WHISPER_CPU_THREADS = int(os.getenv('LOCAL_WHISPER_CPU_THREADS', 0))
+LOCAL_WHISPER_BATCH_SIZE = int(os.getenv('LOCAL_WHISPER_BATCH_SIZE', 8))
+# Recordings are streamed through ffmpeg to 16 kHz mono Opus before upload
+TRANSCRIPTION_NORMALIZE_AUDIO = os.getenv('TRANSCRIPTION_NORMALIZE_AUDIO', 'True') == 'True'
+TRANSCRIPTION_SAMPLE_RATE = int(os.getenv('TRANSCRIPTION_SAMPLE_RATE', 16000))
+TRANSCRIPTION_AUDIO_BITRATE = os.getenv('TRANSCRIPTION_AUDIO_BITRATE', '24k')
+# Whisper rejects uploads above 25 MB; chunks are kept below this with some headroom
+TRANSCRIPTION_CHUNK_MAX_BYTES = int(os.getenv('TRANSCRIPTION_CHUNK_MAX_BYTES', 20 * 1024 * 1024))
+TRANSCRIPTION_CHUNK_MAX_SECONDS = int(os.getenv('TRANSCRIPTION_CHUNK_MAX_SECONDS', 600))
+TRANSCRIPTION_MAX_WORKERS = int(os.getenv('TRANSCRIPTION_MAX_WORKERS', 4))
+
+# Speaker diarization (pyannote) is off unless explicitly enabled
+TRANSCRIPTION_DIARIZATION_ENABLED = os.getenv('TRANSCRIPTION_DIARIZATION_ENABLED', 'False') == 'True'
+DIARIZATION_MODEL = os.getenv('DIARIZATION_MODEL', 'pyannote/speaker-diarization-3.1')
+DIARIZATION_AUTH_TOKEN = os.getenv('HUGGINGFACE_TOKEN', '')
+# torch threads per Celery worker process; 0 keeps torch's default
+DIARIZATION_TORCH_THREADS = int(os.getenv('DIARIZATION_TORCH_THREADS', 0))
+DIARIZATION_TORCH_INTEROP_THREADS = int(os.getenv('DIARIZATION_TORCH_INTEROP_THREADS', 0))
+
+# Transcripts above this many tokens are summarized in concurrent chunks, then merged
+SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', 3000))
+SUMMARY_MAX_WORKERS = int(os.getenv('SUMMARY_MAX_WORKERS', 4))
+SUMMARY_MAX_LEVELS = int(os.getenv('SUMMARY_MAX_LEVELS', 3))
+# Partial minutes are written to Meeting.summary_progress every this many streamed tokens
+SUMMARY_PROGRESS_FLUSH_TOKENS = int(os.getenv('SUMMARY_PROGRESS_FLUSH_TOKENS', 40))
+
+# Threads used by tiktoken for batched token counting
+TOKENIZER_THREADS = int(os.getenv('TOKENIZER_THREADS', 8))
+
+
+# Embedding storage. Vectors are requested from the embedding model at EMBEDDING_DIMENSIONS
+# (text-embedding-3 models support shortened embeddings) and stored as halfvec. Migrations
+# create 1536-d columns; to use another size, run the reencode_embeddings command.
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', 1536))
+# 'halfvec' searches the half-precision HNSW index; 'binary' searches the binary-quantized
+# index and reranks the best VECTOR_RERANK_CANDIDATES chunks by their half-precision distance
+VECTOR_SEARCH_MODE = os.getenv('VECTOR_SEARCH_MODE', 'halfvec')
+VECTOR_RERANK_CANDIDATES = int(os.getenv('VECTOR_RERANK_CANDIDATES', 200))
+
+
+# Ask endpoint settings
+# Number of meeting chunk texts kept in each process's LRU cache
+CHUNK_TEXT_CACHE_SIZE = int(os.getenv('CHUNK_TEXT_CACHE_SIZE', 2048))
+# HNSW candidate list size per vector search, and iterative scan mode for team-filtered
+# searches ('relaxed_order', 'strict_order' or '' to disable). Iterative scans are only
+# used on pgvector >= 0.8; without them, scoped searches that come back short are re-run
+# as an exact scan.
+VECTOR_SEARCH_EF_SEARCH = int(os.getenv('VECTOR_SEARCH_EF_SEARCH', 100))
+VECTOR_SEARCH_ITERATIVE_SCAN = os.getenv('VECTOR_SEARCH_ITERATIVE_SCAN', 'relaxed_order')
+# Hybrid retrieval: lexical and vector rankings fused with reciprocal rank fusion
+SEARCH_HYBRID_ENABLED = os.getenv('SEARCH_HYBRID_ENABLED', 'True') == 'True'
+SEARCH_CANDIDATES = int(os.getenv('SEARCH_CANDIDATES', 50))
+SEARCH_RRF_K = int(os.getenv('SEARCH_RRF_K', 60))
+# Also match completed meetings that have no chunks yet on Meeting.embeddings; can be
+# turned off once backfill_meeting_chunks has run
+SEARCH_LEGACY_MEETINGS = os.getenv('SEARCH_LEGACY_MEETINGS', 'True') == 'True'
+# Questions whose best chunk is further than this cosine distance from them are answered
+# from a template without calling the chat model; teams can override it (Team.search_max_distance)
+SEARCH_MAX_DISTANCE = float(os.getenv('SEARCH_MAX_DISTANCE', 0.8))
+# Whether the project and period a question mentions ("last week on project X") scope the
+# search when the request does not give them; requests can set "extract_filters" themselves
+SEARCH_EXTRACT_FILTERS = os.getenv('SEARCH_EXTRACT_FILTERS', 'False') == 'True'
+
+# Query embeddings are cached per process and in Redis
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', 1024))
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv('QUERY_EMBEDDING_CACHE_TTL', 24 * 3600))
+# Print the per-process hit/miss metrics every this many lookups (0 to disable)
+QUERY_EMBEDDING_CACHE_LOG_EVERY = int(os.getenv('QUERY_EMBEDDING_CACHE_LOG_EVERY', 1000))
+
+# Answers are reused for a team's questions at or above this cosine similarity, until a
+# meeting of the team is completed or edited, or ANSWER_CACHE_TTL seconds have passed
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'True') == 'True'
+ANSWER_CACHE_SIMILARITY = float(os.getenv('ANSWER_CACHE_SIMILARITY', 0.97))
+ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', 7 * 24 * 3600))
+
+# Multi-turn ask sessions keep their retrieved context in the cache for ASK_SESSION_TTL
+# seconds after the last question. A follow-up retrieves again only when its similarity
+# to the question the context was retrieved for is below ASK_SESSION_DRIFT_SIMILARITY.
+ASK_SESSION_TTL = int(os.getenv('ASK_SESSION_TTL', 30 * 60))
+ASK_SESSION_DRIFT_SIMILARITY = float(os.getenv('ASK_SESSION_DRIFT_SIMILARITY', 0.75))
+ASK_SESSION_MAX_TURNS = int(os.getenv('ASK_SESSION_MAX_TURNS', 6))
\ No newline at end of file
@@ -1,3 +1,13 @@
 from django.contrib import admin
+from .models import AnswerCacheEntry
 
-# Register your models here.
+
+class AnswerCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('query', 'team', 'model', 'created_at')
+    search_fields = ['query', 'answer']
+    list_filter = ['team', 'model']
+    readonly_fields = ['created_at']
+    exclude = ['query_embedding']
+
+
+admin.site.register(AnswerCacheEntry, AnswerCacheEntryAdmin)
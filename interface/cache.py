@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from django.core.cache import cache
+
+
+class LRUCache:
+    """A small thread-safe in-process LRU mapping, with optional expiry in seconds."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            expires_at, value = self._data[key]
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoLevelCache:
+    """
+    An in-process LRU in front of the shared Django cache (Redis).
+
+    Values found in the shared cache are copied into the local one. Counts local hits,
+    shared hits and misses; a shared cache that is down counts as a miss. With log_every,
+    the metrics are printed after every that many lookups.
+    """
+
+    def __init__(self, prefix, maxsize=1024, ttl=3600, log_every=None):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.log_every = log_every
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, event):
+        with self._stats_lock:
+            self.stats[event] += 1
+            lookups = self.stats['local_hits'] + self.stats['shared_hits'] + self.stats['misses']
+        if self.log_every and event != 'shared_errors' and lookups % self.log_every == 0:
+            print(f"{self.prefix} cache metrics: {self.metrics()}")
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+        try:
+            value = cache.get(f"{self.prefix}:{key}")
+        except Exception as e:
+            print(f"Shared cache unavailable: {e}")
+            self._count('shared_errors')
+            value = None
+        if value is not None:
+            self._count('shared_hits')
+            self.local.set(key, value)
+            return value
+        self._count('misses')
+        return None
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        try:
+            cache.set(f"{self.prefix}:{key}", value, timeout=self.ttl)
+        except Exception as e:
+            print(f"Shared cache unavailable: {e}")
+            self._count('shared_errors')
+
+    def metrics(self):
+        """Return the hit/miss counters of this process, with the overall hit rate."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats.get('local_hits', 0) + stats.get('shared_hits', 0) + stats.get('misses', 0)
+        hits = stats.get('local_hits', 0) + stats.get('shared_hits', 0)
+        stats['hit_rate'] = hits / lookups if lookups else 0.0
+        return stats
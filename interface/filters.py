@@ -0,0 +1,163 @@
+import re
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from transcription.text import normalize_arabic
+
+
+# Weeks start on Sunday (Python weekday 6)
+WEEK_START = 6
+
+
+def phrase(pattern):
+    """Match one of the alternatives of a pattern as whole words only."""
+    return re.compile(rf'(?<!\w)(?:{pattern})(?!\w)')
+
+
+# Relative periods in questions, as normalized Arabic or lowercase English
+LAST_N_DAYS = phrase(r'(?:اخر|last|past)\s+(\d+)\s+(?:ايام|يوم|days?)')
+PERIODS = [
+    ('last_week', phrase(r'الاسبوع الماضي|last week')),
+    ('this_week', phrase(r'هذا الاسبوع|الاسبوع الحالي|this week')),
+    ('last_month', phrase(r'الشهر الماضي|last month')),
+    ('this_month', phrase(r'هذا الشهر|الشهر الحالي|this month')),
+    ('yesterday', phrase(r'امس|البارحه|yesterday')),
+    ('today', phrase(r'اليوم|today')),
+]
+
+
+def empty_filters():
+    return {"project_ids": None, "created_after": None, "created_before": None}
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def period_range(period, today, days=None):
+    """Return the [start, end) dates of a relative period ending today (included)."""
+    tomorrow = today + timedelta(days=1)
+    week_start = today - timedelta(days=(today.weekday() - WEEK_START) % 7)
+    month_start = today.replace(day=1)
+    if period == 'last_n_days':
+        return today - timedelta(days=max(days, 1) - 1), tomorrow
+    if period == 'today':
+        return today, tomorrow
+    if period == 'yesterday':
+        return today - timedelta(days=1), today
+    if period == 'this_week':
+        return week_start, tomorrow
+    if period == 'last_week':
+        return week_start - timedelta(days=7), week_start
+    if period == 'this_month':
+        return month_start, tomorrow
+    if period == 'last_month':
+        return (month_start - timedelta(days=1)).replace(day=1), month_start
+    raise ValueError(f"Unknown period '{period}'")
+
+
+def extract_search_filters(query: str, user_team_id: int = None, today=None):
+    """
+    Find the time period and the team's projects a question refers to, e.g. "last week"
+    or a project title, without calling a model.
+
+    :return: A filters dict (see parse_search_filters); fields that are not mentioned are None.
+    """
+    from transcription.models import Project
+
+    filters = empty_filters()
+    text = normalize_arabic(query)
+    today = today or timezone.localdate()
+
+    match = LAST_N_DAYS.search(text)
+    if match:
+        start, end = period_range('last_n_days', today, days=int(match.group(1)))
+    else:
+        start = end = None
+        for period, pattern in PERIODS:
+            if pattern.search(text):
+                start, end = period_range(period, today)
+                break
+    if start:
+        filters["created_after"] = start_of_day(start)
+        filters["created_before"] = start_of_day(end)
+
+    if user_team_id:
+        project_ids = [
+            project_id
+            for project_id, title, code in Project.objects.filter(team_account_id=user_team_id).values_list('id', 'title', 'code')
+            if any(
+                name and len(name) >= 3 and re.search(rf'(?<!\w){re.escape(normalize_arabic(name))}(?!\w)', text)
+                for name in (title, code)
+            )
+        ]
+        filters["project_ids"] = project_ids or None
+
+    return filters
+
+
+def parse_moment(value, field, end=False):
+    """Parse an ISO date or datetime; a date used as an end covers that whole day."""
+    # Dates first: parse_datetime also accepts a bare date (as midnight) on Python 3.11+
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is not None:
+        return start_of_day(day + timedelta(days=1) if end else day)
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f"'{field}' must be an ISO date or datetime")
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+def is_id(value):
+    """Whether a JSON value is an integer id, as a number or a string of digits."""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, str) and value.isascii() and value.isdigit())
+
+
+def parse_search_filters(data):
+    """
+    Read the optional search scope of an ask request.
+
+    "project_ids" is a list of project ids; "created_after" and "created_before" are ISO
+    dates or datetimes, the end being exclusive for datetimes and inclusive for dates.
+
+    :raises ValueError: If a field is malformed (or a date is not a real date).
+    """
+    filters = empty_filters()
+
+    project_ids = data.get('project_ids')
+    if project_ids is not None:
+        if not isinstance(project_ids, list):
+            raise ValueError("'project_ids' must be a list of project ids")
+        if not all(is_id(project_id) for project_id in project_ids):
+            raise ValueError("'project_ids' must be a list of project ids")
+        filters["project_ids"] = [int(project_id) for project_id in project_ids] or None
+
+    for field, end in [('created_after', False), ('created_before', True)]:
+        if data.get(field):
+            filters[field] = parse_moment(str(data[field]), field, end=end)
+
+    return filters
+
+
+def search_filters(data, query: str, user_team_id: int = None):
+    """
+    The search scope of an ask request: the fields given in the request, and, when
+    "extract_filters" is set (default SEARCH_EXTRACT_FILTERS), those found in the question
+    for the fields that were not given.
+
+    :raises ValueError: If a field of the request is malformed.
+    """
+    filters = parse_search_filters(data)
+    if data.get('extract_filters', settings.SEARCH_EXTRACT_FILTERS):
+        extracted = extract_search_filters(query, user_team_id)
+        filters = {field: filters[field] or extracted[field] for field in filters}
+    return filters
@@ -0,0 +1,92 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from interface.utils import configure_vector_search
+
+
+TABLE = "vector_search_benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure p50/p99 latency, rows returned and recall@k of team-filtered HNSW search on synthetic "
+        "vectors at several table sizes. Recall is measured against an exact scan (index scans disabled). "
+        "Works on a throwaway table, never on meeting data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default="10000,100000,1000000", help="Comma-separated row counts")
+        parser.add_argument('--dimensions', type=int, default=1536)
+        parser.add_argument('--teams', type=int, default=200, help="Number of teams the rows are spread across")
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        dimensions = options['dimensions']
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            self.stdout.write(f"Building {size} rows of {dimensions}-d vectors across {options['teams']} teams...")
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {TABLE};")
+                cursor.execute(f"""
+                    CREATE UNLOGGED TABLE {TABLE} (
+                        id bigserial PRIMARY KEY,
+                        team_id integer NOT NULL,
+                        embedding vector({dimensions}) NOT NULL
+                    );
+                """)
+                cursor.execute(f"""
+                    INSERT INTO {TABLE} (team_id, embedding)
+                    SELECT floor(random() * %s)::int,
+                           (SELECT array_agg(random() - 0.5) FROM generate_series(1, %s) WHERE g > 0)::vector
+                    FROM generate_series(1, %s) g;
+                """, [options['teams'], dimensions, size])
+                started = time.perf_counter()
+                cursor.execute(f"CREATE INDEX ON {TABLE} USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64);")
+                cursor.execute(f"CREATE INDEX ON {TABLE} (team_id);")
+                cursor.execute(f"ANALYZE {TABLE};")
+                self.stdout.write(f"  index build: {time.perf_counter() - started:.1f}s")
+
+            search = f"""
+                WITH candidates AS MATERIALIZED (
+                    SELECT id, embedding <-> %s::vector AS distance
+                    FROM {TABLE}
+                    WHERE team_id = %s
+                    ORDER BY distance
+                    LIMIT %s
+                )
+                SELECT id FROM candidates ORDER BY distance;
+            """
+            try:
+                latencies, returned, recalls = [], [], []
+                for _ in range(options['queries']):
+                    query = [random.random() - 0.5 for _ in range(dimensions)]
+                    team_id = random.randrange(options['teams'])
+                    params = [query, team_id, options['limit']]
+                    with transaction.atomic(), connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL enable_indexscan = off;")
+                        cursor.execute(search, params)
+                        exact = {row[0] for row in cursor.fetchall()}
+                    with transaction.atomic(), connection.cursor() as cursor:
+                        configure_vector_search(cursor)
+                        started = time.perf_counter()
+                        cursor.execute(search, params)
+                        found = {row[0] for row in cursor.fetchall()}
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    returned.append(len(found))
+                    if exact:
+                        recalls.append(len(found & exact) / len(exact))
+
+                percentiles = statistics.quantiles(latencies, n=100)
+                short = sum(count < options['limit'] for count in returned)
+                self.stdout.write(
+                    f"  {size:>9} rows: p50 {percentiles[49]:.1f} ms, p99 {percentiles[98]:.1f} ms, "
+                    f"rows returned mean {statistics.mean(returned):.1f} / min {min(returned)} "
+                    f"({short} queries short of {options['limit']}), "
+                    f"recall@{options['limit']} {statistics.mean(recalls) if recalls else 0.0:.3f} "
+                    f"over {len(latencies)} queries"
+                )
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {TABLE};")
@@ -0,0 +1,141 @@
+import random
+import statistics
+import time
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from interface.utils import configure_vector_search
+
+
+TABLE = "vector_storage_benchmark"
+MODES = ('vector', 'halfvec', 'binary')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare recall@k, latency and size of full-precision, half-precision and binary-quantized "
+        "vectors at several dimensions, on a sample of the stored meeting chunk embeddings. "
+        "Recall is measured against exact search over the stored vectors. Works on a throwaway table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dimensions', default="1536,768,512,256", help="Comma-separated dimensions")
+        parser.add_argument('--modes', default=",".join(MODES), help="Comma-separated storage modes")
+        parser.add_argument('--sample', type=int, default=50000, help="Number of chunks to copy")
+        parser.add_argument('--queries', type=int, default=200, help="Chunks used as queries")
+        parser.add_argument('--k', type=int, default=10)
+
+    def handle(self, *args, **options):
+        modes = options['modes'].split(',')
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}. Choose from: {', '.join(MODES)}")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, embedding::vector::real[] FROM transcription_meetingchunk ORDER BY random() LIMIT %s;",
+                [options['sample']],
+            )
+            rows = cursor.fetchall()
+        if len(rows) <= options['k']:
+            raise CommandError("Not enough meeting chunks to benchmark.")
+
+        ids = np.array([chunk_id for chunk_id, _ in rows])
+        vectors = np.array([embedding for _, embedding in rows], dtype=np.float32)
+        stored_dimensions = vectors.shape[1]
+        query_rows = random.sample(range(len(rows)), min(options['queries'], len(rows)))
+        self.stdout.write(
+            f"{len(rows)} chunks of {stored_dimensions}-d vectors, {len(query_rows)} queries, "
+            f"recall@{options['k']} against exact search"
+        )
+
+        # Exact neighbours of each query chunk over the stored vectors, the chunk itself excluded
+        truth = {}
+        for row in query_rows:
+            distances = np.linalg.norm(vectors - vectors[row], axis=1)
+            distances[row] = np.inf
+            truth[row] = set(ids[np.argsort(distances)[:options['k']]].tolist())
+
+        for dimensions in [int(d) for d in options['dimensions'].split(',')]:
+            if dimensions > stored_dimensions:
+                self.stdout.write(f"  skipping {dimensions}-d: stored vectors have {stored_dimensions}")
+                continue
+            for mode in modes:
+                self.benchmark(mode, dimensions, ids, vectors, query_rows, truth, options['k'])
+
+    def benchmark(self, mode, dimensions, ids, vectors, query_rows, truth, k):
+        column_type = 'vector' if mode == 'vector' else 'halfvec'
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE};")
+            cursor.execute(f"CREATE UNLOGGED TABLE {TABLE} (id bigint PRIMARY KEY, embedding {column_type}({dimensions}) NOT NULL);")
+            cursor.execute(f"""
+                INSERT INTO {TABLE} (id, embedding)
+                SELECT id, l2_normalize(subvector(embedding::vector, 1, {dimensions}))::{column_type}({dimensions})
+                FROM transcription_meetingchunk
+                WHERE id = ANY(%s);
+            """, [ids.tolist()])
+            started = time.perf_counter()
+            if mode == 'binary':
+                cursor.execute(
+                    f"CREATE INDEX {TABLE}_idx ON {TABLE} USING hnsw "
+                    f"((binary_quantize(embedding)::bit({dimensions})) bit_hamming_ops) WITH (m = 16, ef_construction = 64);"
+                )
+            else:
+                cursor.execute(
+                    f"CREATE INDEX {TABLE}_idx ON {TABLE} USING hnsw "
+                    f"(embedding {column_type}_l2_ops) WITH (m = 16, ef_construction = 64);"
+                )
+            build_seconds = time.perf_counter() - started
+            cursor.execute(f"ANALYZE {TABLE};")
+            cursor.execute(
+                f"SELECT pg_relation_size('{TABLE}_idx'), pg_table_size('{TABLE}');"
+            )
+            index_bytes, table_bytes = cursor.fetchone()
+
+        if mode == 'binary':
+            sql_query = f"""
+                SELECT id FROM (
+                    SELECT id, embedding <-> %(embedding)s::halfvec({dimensions}) AS distance
+                    FROM {TABLE}
+                    ORDER BY binary_quantize(embedding)::bit({dimensions}) <~> binary_quantize(%(embedding)s::halfvec({dimensions}))
+                    LIMIT %(rerank_candidates)s
+                ) shortlist
+                ORDER BY distance
+                LIMIT %(limit)s;
+            """
+        else:
+            sql_query = f"""
+                SELECT id FROM {TABLE}
+                ORDER BY embedding <-> %(embedding)s::{column_type}({dimensions})
+                LIMIT %(limit)s;
+            """
+
+        try:
+            latencies = []
+            recalls = []
+            for row in query_rows:
+                query = vectors[row, :dimensions]
+                query = (query / np.linalg.norm(query)).tolist()
+                with transaction.atomic(), connection.cursor() as cursor:
+                    configure_vector_search(cursor)
+                    started = time.perf_counter()
+                    cursor.execute(sql_query, {
+                        "embedding": query,
+                        "rerank_candidates": max(settings.VECTOR_RERANK_CANDIDATES, k + 1),
+                        "limit": k + 1,
+                    })
+                    found = [chunk_id for chunk_id, in cursor.fetchall() if chunk_id != ids[row]][:k]
+                    latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(len(truth[row].intersection(found)) / k)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {TABLE};")
+
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f"  {mode:>7} {dimensions:>5}-d: recall@{k} {statistics.mean(recalls):.3f}, "
+            f"p50 {percentiles[49]:.1f} ms, p99 {percentiles[98]:.1f} ms, "
+            f"index {index_bytes / 2 ** 20:.1f} MB, table {table_bytes / 2 ** 20:.1f} MB, "
+            f"index build {build_seconds:.1f}s"
+        )
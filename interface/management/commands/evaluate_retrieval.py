@@ -0,0 +1,162 @@
+"""
+Evaluate search_similar_embeddings on a labeled query set.
+
+The query set is a JSON list of labeled questions:
+
+    [
+        {
+            "query": "متى موعد تسليم المرحلة الثانية؟",
+            "team_id": 3,
+            "expected_meeting_ids": [41, 57]
+        }
+    ]
+
+Entries may also scope the search with "project_ids", "created_after" and
+"created_before", as accepted by the ask endpoint.
+
+Chunks are collapsed to meetings in rank order, and recall@k and MRR are computed over
+the meeting ranking. Latency covers the search query only; query embeddings go through
+the query embedding cache and are fetched before timing starts.
+"""
+import json
+import statistics
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from openai import OpenAI
+from interface.filters import parse_search_filters
+from interface.utils import embed_query, search_similar_embeddings
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a labeled query set (question -> expected meeting ids) through the search and report "
+        "recall@k, MRR and p50/p95/p99 latency, optionally writing JSON results to diff between runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', help="Path of the JSON query set")
+        parser.add_argument('--output', help="Write the results as JSON to this path")
+        parser.add_argument('--k', default="1,3,5,10", help="Comma-separated cut-offs for recall@k")
+        parser.add_argument('--chunk-limit', type=int, default=20, help="Chunks retrieved per query")
+        parser.add_argument('--repeat', type=int, default=3, help="Timed runs per query")
+        # Search backend and index parameters; settings are used when not given
+        parser.add_argument('--mode', choices=['halfvec', 'binary'], help="VECTOR_SEARCH_MODE")
+        parser.add_argument('--hybrid', choices=['on', 'off'], help="SEARCH_HYBRID_ENABLED")
+        parser.add_argument('--ef-search', type=int, help="VECTOR_SEARCH_EF_SEARCH")
+        parser.add_argument('--iterative-scan', help="VECTOR_SEARCH_ITERATIVE_SCAN ('' to disable)")
+        parser.add_argument('--candidates', type=int, help="SEARCH_CANDIDATES")
+        parser.add_argument('--rerank-candidates', type=int, help="VECTOR_RERANK_CANDIDATES")
+        parser.add_argument('--rrf-k', type=int, help="SEARCH_RRF_K")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['queries'], encoding='utf-8') as f:
+                labeled_queries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Could not read the query set: {e}")
+        if not isinstance(labeled_queries, list) or not labeled_queries:
+            raise CommandError("The query set must be a non-empty JSON list")
+        filters = []
+        for i, item in enumerate(labeled_queries):
+            if not item.get('query') or not item.get('expected_meeting_ids'):
+                raise CommandError(f"Query {i} needs a 'query' and a non-empty 'expected_meeting_ids'")
+            try:
+                filters.append(parse_search_filters(item))
+            except ValueError as e:
+                raise CommandError(f"Query {i}: {e}")
+
+        cutoffs = [int(k) for k in options['k'].split(',')]
+        overrides = {
+            setting: options[option]
+            for option, setting in [
+                ('mode', 'VECTOR_SEARCH_MODE'),
+                ('ef_search', 'VECTOR_SEARCH_EF_SEARCH'),
+                ('iterative_scan', 'VECTOR_SEARCH_ITERATIVE_SCAN'),
+                ('candidates', 'SEARCH_CANDIDATES'),
+                ('rerank_candidates', 'VECTOR_RERANK_CANDIDATES'),
+                ('rrf_k', 'SEARCH_RRF_K'),
+            ]
+            if options[option] is not None
+        }
+        if options['hybrid'] is not None:
+            overrides['SEARCH_HYBRID_ENABLED'] = options['hybrid'] == 'on'
+
+        client = OpenAI()
+        embeddings = [embed_query(client, item['query']) for item in labeled_queries]
+
+        with override_settings(**overrides):
+            config = {
+                setting: getattr(settings, setting)
+                for setting in [
+                    'EMBEDDING_DIMENSIONS', 'VECTOR_SEARCH_MODE', 'SEARCH_HYBRID_ENABLED',
+                    'VECTOR_SEARCH_EF_SEARCH', 'VECTOR_SEARCH_ITERATIVE_SCAN', 'SEARCH_CANDIDATES',
+                    'VECTOR_RERANK_CANDIDATES', 'SEARCH_RRF_K',
+                ]
+            }
+            config['chunk_limit'] = options['chunk_limit']
+
+            results = []
+            latencies = []
+            for item, embedding, item_filters in zip(labeled_queries, embeddings, filters):
+                query_latencies = []
+                for _ in range(max(options['repeat'], 1)):
+                    started = time.perf_counter()
+                    chunks = search_similar_embeddings(
+                        embedding, item.get('team_id'), chunk_limit=options['chunk_limit'], query=item['query'],
+                        **item_filters,
+                    )
+                    query_latencies.append((time.perf_counter() - started) * 1000)
+                latencies.extend(query_latencies)
+                results.append(self.score(item, chunks, cutoffs, query_latencies))
+
+        report = {
+            "config": config,
+            "metrics": self.aggregate(results, cutoffs, latencies),
+            "queries": results,
+        }
+
+        metrics = report["metrics"]
+        self.stdout.write(f"{len(results)} queries")
+        for k in cutoffs:
+            self.stdout.write(f"  recall@{k}: {metrics[f'recall@{k}']:.3f}")
+        self.stdout.write(f"  MRR: {metrics['mrr']:.3f}")
+        latency = metrics['latency_ms']
+        self.stdout.write(f"  latency: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+                f.write("\n")
+            self.stdout.write(f"Results written to {options['output']}")
+
+    @staticmethod
+    def score(item, chunks, cutoffs, latencies):
+        """Score one query on its meeting ranking (chunks collapsed to meetings, best first)."""
+        retrieved = list(dict.fromkeys(chunk["meeting_id"] for chunk in chunks))
+        expected = set(item['expected_meeting_ids'])
+        first_hit = next((rank for rank, meeting_id in enumerate(retrieved, 1) if meeting_id in expected), None)
+        return {
+            "query": item['query'],
+            "team_id": item.get('team_id'),
+            "expected_meeting_ids": sorted(expected),
+            "retrieved_meeting_ids": retrieved,
+            "reciprocal_rank": 1 / first_hit if first_hit else 0.0,
+            **{f"recall@{k}": len(expected.intersection(retrieved[:k])) / len(expected) for k in cutoffs},
+            "latency_ms": round(statistics.median(latencies), 3),
+        }
+
+    @staticmethod
+    def aggregate(results, cutoffs, latencies):
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            **{f"recall@{k}": statistics.mean(result[f"recall@{k}"] for result in results) for k in cutoffs},
+            "mrr": statistics.mean(result["reciprocal_rank"] for result in results),
+            "latency_ms": {
+                "p50": round(percentiles[49], 3),
+                "p95": round(percentiles[94], 3),
+                "p99": round(percentiles[98], 3),
+                "mean": round(statistics.mean(latencies), 3),
+            },
+        }
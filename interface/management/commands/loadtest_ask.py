@@ -0,0 +1,72 @@
+import asyncio
+import statistics
+import time
+import httpx
+from django.core.management.base import BaseCommand
+
+
+DEFAULT_QUERIES = [
+    "What did we decide in the last meeting?",
+    "Which action items are still open?",
+    "What risks were raised about the schedule?",
+    "Who is responsible for the budget review?",
+    "What did the client ask for in the latest project meeting?",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent POSTs at an ask endpoint and report throughput and latency percentiles. "
+        "Run it against ask/ and ask/async/ to compare the sync and ASGI paths. Requests bypass the "
+        "answer cache unless --answer-cache is given, so each one retrieves and calls the model."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="Full endpoint URL, e.g. http://localhost:8000/interface/ask/async/")
+        parser.add_argument('--token', required=True, help="API token of the user to ask as")
+        parser.add_argument('--query', action='append', dest='queries',
+                            help="Question to ask; repeat to cycle through several (default: a built-in set)")
+        parser.add_argument('--answer-cache', action='store_true', help="Let requests be answered from the answer cache")
+        parser.add_argument('--concurrency', default="1,10,50", help="Comma-separated concurrency levels")
+        parser.add_argument('--requests', type=int, default=100, help="Requests per concurrency level")
+        parser.add_argument('--timeout', type=float, default=120.0)
+
+    def handle(self, *args, **options):
+        for concurrency in [int(level) for level in options['concurrency'].split(',')]:
+            result = asyncio.run(self.run_level(options, concurrency))
+            latencies = sorted(result['latencies'])
+            if not latencies:
+                self.stdout.write(f"concurrency={concurrency:<4} all {result['errors']} requests failed")
+                continue
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f"concurrency={concurrency:<4} requests={options['requests']} errors={result['errors']} "
+                f"throughput={len(latencies) / result['elapsed']:.1f}/s "
+                f"p50={quantiles[49] * 1000:.0f}ms p95={quantiles[94] * 1000:.0f}ms p99={quantiles[98] * 1000:.0f}ms"
+            )
+
+    async def run_level(self, options, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        state = {'errors': 0, 'latencies': []}
+        headers = {'Authorization': f"Token {options['token']}"}
+        queries = options['queries'] or DEFAULT_QUERIES
+
+        async with httpx.AsyncClient(timeout=options['timeout'], limits=httpx.Limits(max_connections=concurrency)) as client:
+            async def one_request(number):
+                body = {'query': queries[number % len(queries)], 'answer_cache': options['answer_cache']}
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post(options['url'], json=body, headers=headers)
+                        if response.status_code == 200:
+                            state['latencies'].append(time.perf_counter() - started)
+                        else:
+                            state['errors'] += 1
+                    except httpx.HTTPError:
+                        state['errors'] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one_request(number) for number in range(options['requests'])))
+            state['elapsed'] = time.perf_counter() - started
+
+        return state
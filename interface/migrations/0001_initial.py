@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:40
+
+import django.db.models.deletion
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('teams', '0002_teammember'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.TextField()),
+                ('query_embedding', pgvector.django.vector.VectorField(dimensions=1536)),
+                ('model', models.CharField(max_length=50)),
+                ('answer', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_cache_entries', to='teams.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['team', 'created_at'], name='answercache_team_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:30
+
+import pgvector.django.halfvec
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interface', '0001_initial'),
+    ]
+
+    operations = [
+        # Cached answers are cheap to lose and their embeddings may not fit the new size
+        migrations.RunSQL('DELETE FROM interface_answercacheentry;', migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='answercacheentry',
+            name='query_embedding',
+            field=pgvector.django.halfvec.HalfVectorField(dimensions=1536),
+        ),
+    ]
@@ -1,3 +1,22 @@
+from django.conf import settings
 from django.db import models
+from pgvector.django import HalfVectorField
+from teams.models import Team
 
-# Create your models here.
+
+class AnswerCacheEntry(models.Model):
+    """An answer given to a team, reused for later questions with a near-identical embedding."""
+    team = models.ForeignKey(Team, related_name='answer_cache_entries', on_delete=models.CASCADE)
+    query = models.TextField()
+    query_embedding = HalfVectorField(dimensions=settings.EMBEDDING_DIMENSIONS)
+    model = models.CharField(max_length=50)
+    answer = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(name='answercache_team_created_idx', fields=['team', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.query[:50]}..."
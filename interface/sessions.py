@@ -0,0 +1,42 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+
+
+def session_key(session_id):
+    return f"ask-session:{session_id}"
+
+
+def new_session(user_id, team_id, model):
+    """
+    A conversation with the ask endpoint.
+
+    The context (retrieved chunks with their text) is kept between questions together with
+    the embedding of the question it was retrieved for, its token count and the search
+    filters it was retrieved with, so follow-ups on the same topic and in the same scope
+    are answered without searching again.
+    """
+    return {
+        "id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "team_id": team_id,
+        "model": model,
+        "filters": {},
+        "anchor_embedding": None,
+        "context": [],
+        "context_tokens": 0,
+        "turns": [],
+    }
+
+
+def load_session(session_id, user_id):
+    """Return a session of the user, or None if it does not exist or has expired."""
+    session = cache.get(session_key(session_id))
+    if session is None or session["user_id"] != user_id:
+        return None
+    return session
+
+
+def save_session(session):
+    """Store a session, extending its expiry to ASK_SESSION_TTL seconds from now."""
+    cache.set(session_key(session["id"]), session, timeout=settings.ASK_SESSION_TTL)
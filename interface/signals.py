@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from transcription.models import Meeting, Project
+from .models import AnswerCacheEntry
+
+
+@receiver(post_save, sender=Meeting)
+@receiver(post_delete, sender=Meeting)
+def invalidate_team_answers(sender, instance, **kwargs):
+    """Drop a team's cached answers when one of its meetings is completed, edited or deleted."""
+    if instance.status != 'completed' or instance.project_id is None:
+        return
+    team_id = Project.objects.filter(pk=instance.project_id).values_list('team_account_id', flat=True).first()
+    if team_id is not None:
+        AnswerCacheEntry.objects.filter(team_id=team_id).delete()
@@ -1,3 +1,115 @@
-from django.test import TestCase
+from datetime import date
+from unittest import mock
+from django.test import SimpleTestCase
+from interface.filters import extract_search_filters, parse_search_filters, start_of_day
+from interface.utils import pack_context
 
-# Create your tests here.
+
+def chunk(chunk_id, similarity, token_count, meeting_id=1):
+    return {
+        "id": chunk_id, "meeting_id": meeting_id, "index": chunk_id, "token_count": token_count,
+        "similarity": similarity, "score": None,
+    }
+
+
+# (introduction, article wrapper, chunk separator) token counts, so no encoder is loaded
+@mock.patch('interface.utils.template_tokens', return_value=(50, 10, 2))
+class PackContextTests(SimpleTestCase):
+    def test_most_relevant_chunk_is_kept_over_short_ones(self, template_tokens):
+        best = chunk(1, similarity=0.7, token_count=1500)
+        weak = chunk(2, similarity=0.1, token_count=20, meeting_id=2)
+        weakest = chunk(3, similarity=0.05, token_count=20, meeting_id=3)
+
+        selected = pack_context([weak, weakest, best], token_budget=1600)
+
+        self.assertIn(best, selected)
+
+    def test_distance_cutoff_applies_before_packing(self, template_tokens):
+        best = chunk(1, similarity=0.7, token_count=1500)
+        weak = chunk(2, similarity=0.1, token_count=20, meeting_id=2)
+        weakest = chunk(3, similarity=0.05, token_count=20, meeting_id=3)
+
+        selected = pack_context([weak, weakest, best], token_budget=1600, max_distance=0.8)
+
+        self.assertEqual(selected, [best])
+
+    def test_leftover_space_is_backfilled_with_smaller_chunks(self, template_tokens):
+        first = chunk(1, similarity=0.9, token_count=500)
+        too_large = chunk(2, similarity=0.8, token_count=600)
+        small = chunk(3, similarity=0.5, token_count=100, meeting_id=2)
+
+        selected = pack_context([first, too_large, small], token_budget=700)
+
+        self.assertEqual(selected, [first, small])
+
+    def test_selection_keeps_relevance_order_and_budget(self, template_tokens):
+        chunks = [chunk(i, similarity=1 - i / 10, token_count=100, meeting_id=i % 3) for i in range(8)]
+
+        selected = pack_context(chunks, token_budget=450)
+
+        self.assertEqual(selected, chunks[:len(selected)])
+        meetings = {c["meeting_id"] for c in selected}
+        cost = sum(c["token_count"] for c in selected) + 10 * len(meetings) + 2 * (len(selected) - len(meetings))
+        self.assertLessEqual(cost, 450)
+
+
+# A Thursday
+TODAY = date(2024, 5, 16)
+
+
+class ExtractSearchFiltersTests(SimpleTestCase):
+    def assertPeriod(self, query, start, end):
+        filters = extract_search_filters(query, today=TODAY)
+        self.assertEqual((filters["created_after"], filters["created_before"]), (start_of_day(start), start_of_day(end)))
+
+    def test_relative_periods(self):
+        self.assertPeriod("What did we decide last week?", date(2024, 5, 5), date(2024, 5, 12))
+        self.assertPeriod("ماذا ناقشنا هذا الأسبوع؟", date(2024, 5, 12), date(2024, 5, 17))
+        self.assertPeriod("الشهر الماضي", date(2024, 4, 1), date(2024, 5, 1))
+        self.assertPeriod("meetings from yesterday", date(2024, 5, 15), date(2024, 5, 16))
+        self.assertPeriod("ماذا حدث اليوم", date(2024, 5, 16), date(2024, 5, 17))
+
+    def test_last_n_days_include_today(self):
+        self.assertPeriod("in the last 7 days", date(2024, 5, 10), date(2024, 5, 17))
+        self.assertPeriod("آخر ٣ أيام", date(2024, 5, 14), date(2024, 5, 17))
+
+    def test_periods_match_whole_words_only(self):
+        for query in ["plans for last weekend", "the todays list", "التقارير اليومية"]:
+            filters = extract_search_filters(query, today=TODAY)
+            self.assertIsNone(filters["created_after"], query)
+
+    @mock.patch('transcription.models.Project')
+    def test_projects_are_matched_by_title_or_code(self, project):
+        project.objects.filter.return_value.values_list.return_value = [
+            (1, "Riyadh Metro", "RM"), (2, "Budget", "BDG"), (3, "Website", "web"),
+        ]
+
+        filters = extract_search_filters("Status of the riyadh metro and BDG?", user_team_id=4, today=TODAY)
+
+        project.objects.filter.assert_called_once_with(team_account_id=4)
+        self.assertEqual(filters["project_ids"], [1, 2])
+        self.assertIsNone(filters["created_after"])
+
+    @mock.patch('transcription.models.Project')
+    def test_project_names_match_whole_words_only(self, project):
+        project.objects.filter.return_value.values_list.return_value = [(3, "Website", "web")]
+
+        filters = extract_search_filters("any updates on webhooks?", user_team_id=4, today=TODAY)
+
+        self.assertIsNone(filters["project_ids"])
+
+
+class ParseSearchFiltersTests(SimpleTestCase):
+    def test_project_ids_accept_integers_and_digit_strings(self):
+        self.assertEqual(parse_search_filters({"project_ids": [1, "2"]})["project_ids"], [1, 2])
+
+    def test_project_ids_reject_other_values(self):
+        for project_ids in [[1.5], [True], ["1.5"], ["x"], [None], "1"]:
+            with self.assertRaises(ValueError, msg=project_ids):
+                parse_search_filters({"project_ids": project_ids})
+
+    def test_date_end_covers_the_whole_day(self):
+        filters = parse_search_filters({"created_after": "2024-05-01", "created_before": "2024-05-02"})
+
+        self.assertEqual(filters["created_after"], start_of_day(date(2024, 5, 1)))
+        self.assertEqual(filters["created_before"], start_of_day(date(2024, 5, 3)))
@@ -1,7 +1,11 @@
 from django.urls import path
-from .views import ask
+from .views import ask, ask_stream, ask_async, ask_stream_async
 
 
 urlpatterns = [
     path('ask/', ask, name='ask'),
-]
\ No newline at end of file
+    path('ask/stream/', ask_stream, name='ask-stream'),
+    # Async variants, for deployments served by an ASGI server (engine.asgi)
+    path('ask/async/', ask_async, name='ask-async'),
+    path('ask/stream/async/', ask_stream_async, name='ask-stream-async'),
+]
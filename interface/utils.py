@@ -1,9 +1,19 @@
 import ast  # for converting embeddings saved as strings back to arrays
 from openai import OpenAI  # for calling the OpenAI API
 import pandas as pd  # for storing text and embeddings data
-import tiktoken  # for counting tokens
 from scipy import spatial  # for calculating vector similarities for search
-from django.db import connection
+import bisect
+import hashlib
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from pgvector.django import CosineDistance
+from transcription.tokenizer import count_tokens  # for counting tokens
+from transcription.text import normalize_arabic, search_terms  # for lexical search
+from .cache import LRUCache, TwoLevelCache
 
 
 # create a list of models
@@ -11,74 +21,426 @@ GPT_MODELS = ["gpt-4o", "gpt-4o-mini"]
 # models
 EMBEDDING_MODEL = "text-embedding-3-small"
 
+INTRODUCTION = 'You are a helpful assistant that ALWAYS responds in Arabic. Use the below minutes of meetings to answer the subsequent question. If the answer cannot be found in the summaries, respond in Arabic with: "عذراً، لم أتمكن من العثور على إجابة محددة لسؤالك في محاضر الاجتماعات المتوفرة. هل يمكنك إعادة صياغة سؤالك أو تقديم المزيد من التفاصيل؟"'
+ARTICLE_TEMPLATE = '\n\nMinutes of Meeting:\n"""\n{text}\n"""'
+CHUNK_SEPARATOR = "\n...\n"
+# Answer given without calling the model when no meeting is related to the question
+NO_RESULTS_ANSWER = (
+    "عذراً، لم أتمكن من العثور على أي معلومات ذات صلة في سجل اجتماعات فريقك. "
+    "قد يكون ذلك بسبب: \n"
+    "١. لم يتم تسجيل الاجتماع بعد\n"
+    "٢. لم تتم مناقشة الموضوع الذي تسأل عنه في أي من الاجتماعات المسجلة\n"
+    "٣. قد يكون الاجتماع في مساحة عمل فريق آخر\n\n"
+    "يرجى المحاولة:\n"
+    "- إعادة صياغة سؤالك\n"
+    "- التحقق من تسجيل الاجتماع\n"
+    "- التأكد من أنك في مساحة عمل الفريق الصحيح"
+)
+SYSTEM_PROMPT = "You are an assistant that ALWAYS responds in Arabic. You answer questions about the minutes of meetings. Even if the question is in English, you must respond in Arabic."
 
-def search_similar_embeddings(query_embedding, user_team_id=None):
+# Texts of recently retrieved chunks, so hot meetings are served from memory
+chunk_text_cache = LRUCache(maxsize=settings.CHUNK_TEXT_CACHE_SIZE)
+# Per-team relevance thresholds, re-read from the database every minute
+team_threshold_cache = LRUCache(maxsize=1024, ttl=60)
+# Query embeddings, shared across processes through Redis
+query_embedding_cache = TwoLevelCache(
+    'query-embedding',
+    maxsize=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl=settings.QUERY_EMBEDDING_CACHE_TTL,
+    log_every=settings.QUERY_EMBEDDING_CACHE_LOG_EVERY,
+)
+
+
+@lru_cache(maxsize=None)
+def pgvector_version():
+    """The installed pgvector version as a (major, minor) tuple, read once per process."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector';")
+        row = cursor.fetchone()
+    return tuple(int(part) for part in row[0].split('.')[:2]) if row else (0, 0)
+
+
+def configure_vector_search(cursor):
+    """
+    Apply the HNSW search settings to the current transaction.
+
+    ef_search trades recall for latency. With an iterative scan, pgvector keeps reading
+    the index until enough rows pass the team filter instead of returning fewer results.
+    Returns whether an iterative scan is in effect (it needs pgvector >= 0.8).
     """
-    Finds the most similar transcriptions and returns their text content.
-    Filters by user's team if team_id is provided.
+    cursor.execute("SELECT set_config('hnsw.ef_search', %s, true);", [str(settings.VECTOR_SEARCH_EF_SEARCH)])
+    if settings.VECTOR_SEARCH_ITERATIVE_SCAN and pgvector_version() >= (0, 8):
+        cursor.execute("SELECT set_config('hnsw.iterative_scan', %s, true);", [settings.VECTOR_SEARCH_ITERATIVE_SCAN])
+        return True
+    return False
+
+
+def search_similar_embeddings(query_embedding, user_team_id=None, chunk_limit=20, query=None,
+                              project_ids=None, created_after=None, created_before=None):
     """
-    print(query_embedding)
-    
+    Finds the transcript chunks most relevant to the query.
+    Filters by user's team if team_id is provided, and by project and meeting creation
+    time ([created_after, created_before)) when given. These are B-tree predicates on the
+    meeting, so for a narrow scope the planner can read only the scoped meetings' chunks.
+
+    When the query text is given and SEARCH_HYBRID_ENABLED is set, chunks are ranked
+    both by vector distance and by full-text match on their Arabic-normalized text,
+    and the two rankings are fused with reciprocal rank fusion in the same query.
+    Without an iterative scan, the HNSW index is read before the scope is applied, so a
+    scoped search that gets fewer vector candidates than asked for is re-run as an exact scan.
+    With VECTOR_SEARCH_MODE = 'binary', vector candidates come from the binary-quantized
+    index and are reranked by their half-precision distance.
+
+    Returns a list of {"id", "meeting_id", "index", "token_count", "distance", "similarity",
+    "score"} dicts, best first, "distance" being the L2 distance and "similarity" the cosine
+    similarity to the query. The chunk text is left out; fetch it with chunk_texts() for the
+    chunks that are actually used.
+
+    With SEARCH_LEGACY_MEETINGS, completed meetings that have no chunks yet (processed
+    before chunking, see the backfill_meeting_chunks command) are matched on
+    Meeting.embeddings and returned as a single chunk holding their summary.
+    """
+    conditions = []
     if user_team_id:
-        sql_query = """
-            SELECT m.transcription_file
-            FROM transcription_meeting m
+        conditions.append("p.team_account_id = %(team_id)s")
+    if project_ids:
+        conditions.append("m.project_id = ANY(%(project_ids)s)")
+    if created_after:
+        conditions.append("m.created_at >= %(created_after)s")
+    if created_before:
+        conditions.append("m.created_at < %(created_before)s")
+
+    if conditions:
+        scope_join = """
+            JOIN transcription_meeting m ON c.meeting_id = m.id
             JOIN transcription_project p ON m.project_id = p.id
-            WHERE p.team_account_id = %s
-            ORDER BY m.embeddings <-> %s::vector
-            LIMIT 5;
         """
-        params = [user_team_id, query_embedding]
+        scope_filter = "AND " + " AND ".join(conditions)
     else:
-        sql_query = """
-            SELECT transcription_file
-            FROM transcription_meeting
-            ORDER BY embeddings <-> %s::vector
-            LIMIT 5;
+        scope_join = scope_filter = ""
+
+    terms = search_terms(query) if query and settings.SEARCH_HYBRID_ENABLED else []
+    dimensions = int(settings.EMBEDDING_DIMENSIONS)
+
+    if settings.VECTOR_SEARCH_MODE == 'binary':
+        # Shortlist by Hamming distance on the binary-quantized index, then rerank the
+        # shortlist by the exact half-precision distance
+        vector_candidates = f"""
+            SELECT id, distance FROM (
+                SELECT c.id, c.embedding <-> %(embedding)s::halfvec({dimensions}) AS distance
+                FROM transcription_meetingchunk c
+                {scope_join}
+                WHERE TRUE {scope_filter}
+                ORDER BY binary_quantize(c.embedding)::bit({dimensions}) <~> binary_quantize(%(embedding)s::halfvec({dimensions}))
+                LIMIT %(rerank_candidates)s
+            ) shortlist
+            ORDER BY distance
+            LIMIT %(candidates)s
+        """
+    else:
+        vector_candidates = f"""
+            SELECT c.id, c.embedding <-> %(embedding)s::halfvec({dimensions}) AS distance
+            FROM transcription_meetingchunk c
+            {scope_join}
+            WHERE TRUE {scope_filter}
+            ORDER BY distance
+            LIMIT %(candidates)s
         """
-        params = [query_embedding]
 
-    with connection.cursor() as cursor:
+    # The candidate queries walk the HNSW and GIN indexes; a relaxed iterative scan may
+    # return vector rows slightly out of order, so ranks are assigned afterwards.
+    sql_query = f"""
+        WITH vector_candidates AS MATERIALIZED (
+            {vector_candidates}
+        ),
+        vector_ranked AS (
+            SELECT id, row_number() OVER (ORDER BY distance) AS rank
+            FROM vector_candidates
+        ),
+        lexical_ranked AS (
+            SELECT c.id, row_number() OVER (ORDER BY ts_rank_cd(c.search_vector, q) DESC) AS rank
+            FROM transcription_meetingchunk c
+            {scope_join}
+            CROSS JOIN to_tsquery('simple', %(tsquery)s) q
+            WHERE c.search_vector @@ q {scope_filter}
+            ORDER BY rank
+            LIMIT %(candidates)s
+        ),
+        fused AS (
+            SELECT COALESCE(v.id, l.id) AS id,
+                   COALESCE(1.0 / (%(rrf_k)s + v.rank), 0) + COALESCE(1.0 / (%(rrf_k)s + l.rank), 0) AS score
+            FROM vector_ranked v
+            FULL OUTER JOIN lexical_ranked l ON v.id = l.id
+        )
+        SELECT c.id, c.meeting_id, c.index, c.token_count,
+               c.embedding <-> %(embedding)s::halfvec({dimensions}) AS distance,
+               1 - (c.embedding <=> %(embedding)s::halfvec({dimensions})) AS similarity,
+               f.score, (SELECT count(*) FROM vector_candidates) AS vector_count
+        FROM fused f
+        JOIN transcription_meetingchunk c ON c.id = f.id
+        ORDER BY f.score DESC, distance
+        LIMIT %(limit)s;
+    """
+    legacy_sql_query = f"""
+        SELECT m.id, m.summary,
+               m.embeddings <-> %(embedding)s::halfvec({dimensions}) AS distance,
+               1 - (m.embeddings <=> %(embedding)s::halfvec({dimensions})) AS similarity
+        FROM transcription_meeting m
+        JOIN transcription_project p ON m.project_id = p.id
+        WHERE m.status = 'completed' AND m.embeddings IS NOT NULL AND COALESCE(m.summary, '') <> ''
+          AND NOT EXISTS (SELECT 1 FROM transcription_meetingchunk c WHERE c.meeting_id = m.id)
+          {scope_filter}
+        ORDER BY distance
+        LIMIT %(limit)s;
+    """
+    params = {
+        "embedding": query_embedding,
+        "team_id": user_team_id,
+        "project_ids": list(project_ids) if project_ids else None,
+        "created_after": created_after,
+        "created_before": created_before,
+        # NULL when there is nothing to match on, which makes the lexical ranking empty
+        "tsquery": " | ".join(terms) or None,
+        "candidates": max(settings.SEARCH_CANDIDATES, chunk_limit),
+        "rerank_candidates": max(settings.VECTOR_RERANK_CANDIDATES, settings.SEARCH_CANDIDATES, chunk_limit),
+        "rrf_k": settings.SEARCH_RRF_K,
+        "limit": chunk_limit,
+    }
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        iterative_scan = configure_vector_search(cursor)
         cursor.execute(sql_query, params)
         results = cursor.fetchall()
+        vector_count = results[0][-1] if results else 0
+        if conditions and not iterative_scan and vector_count < params["candidates"]:
+            # The scope filtered out most of what the index returned; sequential scans are exact
+            cursor.execute("SET LOCAL enable_indexscan = off;")
+            cursor.execute(sql_query, params)
+            results = cursor.fetchall()
+            cursor.execute("SET LOCAL enable_indexscan = on;")
+        legacy_results = []
+        if settings.SEARCH_LEGACY_MEETINGS:
+            cursor.execute(legacy_sql_query, params)
+            legacy_results = cursor.fetchall()
+
+    chunks = [
+        {
+            "id": chunk_id, "meeting_id": meeting_id, "index": index, "token_count": token_count,
+            "distance": distance, "similarity": similarity, "score": float(score),
+        }
+        for chunk_id, meeting_id, index, token_count, distance, similarity, score, _ in results
+    ]
+    if legacy_results:
+        chunks = merge_legacy_meetings(chunks, legacy_results, chunk_limit)
+    return chunks
+
+
+def merge_legacy_meetings(chunks, legacy_results, chunk_limit):
+    """
+    Add meetings without chunks, as (meeting_id, summary, distance, similarity) rows, to
+    ranked chunks. Each meeting is scored like a vector-only match at the rank its
+    distance would have among the chunks, and carries its summary as "text".
+    """
+    chunk_distances = sorted(chunk["distance"] for chunk in chunks)
+    merged = list(chunks)
+    for position, (meeting_id, summary, distance, similarity) in enumerate(legacy_results):
+        rank = bisect.bisect_left(chunk_distances, distance) + position + 1
+        merged.append({
+            "id": None, "meeting_id": meeting_id, "index": 0, "token_count": count_tokens(summary),
+            "distance": distance, "similarity": similarity, "score": 1.0 / (settings.SEARCH_RRF_K + rank),
+            "text": summary,
+        })
+    merged.sort(key=lambda chunk: (-chunk["score"], chunk["distance"]))
+    return merged[:chunk_limit]
+
+
+def chunk_texts(chunks):
+    """
+    Attach the "text" of each chunk that has none, reading it from the in-process cache
+    or, for misses, from the database in a single query.
+    """
+    texts = {chunk["id"]: chunk_text_cache.get(chunk["id"]) for chunk in chunks if "text" not in chunk}
+    missing = [chunk_id for chunk_id, text in texts.items() if text is None]
+    if missing:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, text FROM transcription_meetingchunk WHERE id = ANY(%s);", [missing])
+            for chunk_id, text in cursor.fetchall():
+                # Chunks are never edited (re-processing creates new rows), so cached texts stay valid
+                chunk_text_cache.set(chunk_id, text)
+                texts[chunk_id] = text
+
+    return [chunk if "text" in chunk else {**chunk, "text": texts[chunk["id"]] or ""} for chunk in chunks]
 
-    # Read the contents of each transcription file
-    transcription_texts = []
-    print(results)
-    for (file_path,) in results:
-        if file_path:  # Ensure file exists
-            try:
-                with open("media/" + file_path, "r", encoding="utf-8") as file:
-                    transcription_texts.append(file.read())
-            except Exception as e:
-                transcription_texts.append(f"Error reading {file_path}: {e}")
 
-    return transcription_texts  # List of retrieved transcription texts
+def group_chunks_by_meeting(chunks):
+    """
+    Join chunks into one text per meeting, in transcript order.
+    Meetings keep the order in which they first appear in chunks.
+    """
+    meeting_chunks = {}
+    for chunk in chunks:
+        meeting_chunks.setdefault(chunk["meeting_id"], []).append(chunk)
+    return [
+        CHUNK_SEPARATOR.join(chunk["text"] for chunk in sorted(group, key=lambda chunk: chunk["index"]))
+        for group in meeting_chunks.values()
+    ]
+
 
+def query_embedding_key(query: str) -> str:
+    """Cache key of a query embedding: the embedding model, its dimensions and the hash of the normalized query."""
+    normalized_query = " ".join(normalize_arabic(query).split())
+    return f"{EMBEDDING_MODEL}:{settings.EMBEDDING_DIMENSIONS}:{hashlib.sha256(normalized_query.encode('utf-8')).hexdigest()}"
+
+
+def embed_query(client, query: str):
+    """
+    Return the embedding of a query, from the query embedding cache when possible.
 
-def strings_ranked_by_relatedness(
+    Queries are keyed by embedding model and normalized text, so repeats that differ
+    only in whitespace, case or Arabic spelling variants share one embedding.
+    """
+    key = query_embedding_key(query)
+    query_embedding = query_embedding_cache.get(key)
+    if query_embedding is None:
+        query_embedding_response = client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=query,
+            dimensions=settings.EMBEDDING_DIMENSIONS,
+        )
+        query_embedding = query_embedding_response.data[0].embedding
+        query_embedding_cache.set(key, query_embedding)
+    return query_embedding
+
+
+def chunks_ranked_by_relatedness(
     client,
     query: str,
     user_team_id: int = None,
-    top_n: int = 1
+    filters: dict = None,
 ):
     """
-    Returns a list of strings and relatednesses, sorted from most related to least.
-    Filters by user's team if team_id is provided.
+    Returns transcript chunks sorted from most related to least.
+    Filters by user's team if team_id is provided, and by the search filters
+    (project_ids, created_after, created_before) if given.
     """
-    query_embedding_response = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=query,
+    query_embedding = embed_query(client, query)
+    return search_similar_embeddings(query_embedding, user_team_id, query=query, **(filters or {}))
+
+
+def relevance(chunk):
+    """Fused rank score of a chunk when available, otherwise its cosine similarity to the query."""
+    if chunk.get("score") is not None:
+        return chunk["score"]
+    return max(0.0, chunk["similarity"])
+
+
+@lru_cache(maxsize=None)
+def template_tokens(model: str = GPT_MODELS[0]):
+    """Token counts of the fixed prompt parts: (introduction, empty article wrapper, chunk separator)."""
+    return (
+        count_tokens(INTRODUCTION, model=model),
+        count_tokens(ARTICLE_TEMPLATE.format(text=""), model=model),
+        count_tokens(CHUNK_SEPARATOR, model=model),
     )
-    query_embedding = query_embedding_response.data[0].embedding
-    strings = search_similar_embeddings(query_embedding, user_team_id)
-    return strings[:top_n]
 
 
-def num_tokens(text: str, model: str = GPT_MODELS[0]) -> int:
-    """Return the number of tokens in a string."""
-    encoding = tiktoken.encoding_for_model(model)
-    return len(encoding.encode(text))
+def pack_context(chunks, token_budget: int, model: str = GPT_MODELS[0], max_distance: float = None):
+    """
+    Choose the chunks to put in the prompt: in relevance order while they fit, with
+    smaller, less relevant chunks filling the space a larger one left unused.
+
+    Chunks further than max_distance (cosine) from the query are dropped first. Uses
+    only the token counts stored with each chunk plus the fixed cost of the article
+    wrapper and separators, so no text is encoded while packing.
+
+    :return: The selected chunks, in their original relevance order.
+    """
+    _, article_tokens, separator_tokens = template_tokens(model)
+    if max_distance is not None:
+        chunks = relevant_chunks(chunks, max_distance)
+
+    selected = set()
+    meetings = set()
+    used = 0
+    ranked = sorted(range(len(chunks)), key=lambda i: relevance(chunks[i]), reverse=True)
+    for i in ranked:
+        chunk = chunks[i]
+        cost = chunk["token_count"] + (separator_tokens if chunk["meeting_id"] in meetings else article_tokens)
+        if used + cost > token_budget:
+            continue
+        selected.add(i)
+        meetings.add(chunk["meeting_id"])
+        used += cost
+
+    return [chunk for i, chunk in enumerate(chunks) if i in selected]
+
+
+def team_max_distance(user_team_id: int = None) -> float:
+    """Cosine distance above which a team's search results count as unrelated to the question."""
+    from teams.models import Team
+
+    if not user_team_id:
+        return settings.SEARCH_MAX_DISTANCE
+    max_distance = team_threshold_cache.get(user_team_id)
+    if max_distance is None:
+        max_distance = Team.objects.filter(pk=user_team_id).values_list('search_max_distance', flat=True).first()
+        if max_distance is None:
+            max_distance = settings.SEARCH_MAX_DISTANCE
+        team_threshold_cache.set(user_team_id, max_distance)
+    return max_distance
+
+
+def relevant_chunks(chunks, max_distance: float):
+    """The chunks within max_distance (cosine) of the query, in their original order."""
+    return [chunk for chunk in chunks if 1 - chunk["similarity"] <= max_distance]
+
+
+def select_context(query: str, chunks, model: str = GPT_MODELS[0], token_budget: int = 4096 - 500,
+                   max_distance: float = None):
+    """Choose the chunks that fit in the token budget left after the fixed prompt parts and the question."""
+    question = f"\n\nQuestion: {query}"
+    introduction_tokens, _, _ = template_tokens(model)
+    remaining_budget = token_budget - introduction_tokens - count_tokens(question, model=model)
+    return pack_context(chunks, remaining_budget, model=model, max_distance=max_distance)
+
+
+def context_message(selected) -> str:
+    """The instructions and meeting minutes of a prompt, from chunks that have their text attached."""
+    message = INTRODUCTION
+    for string in group_chunks_by_meeting(selected):
+        message += ARTICLE_TEMPLATE.format(text=string)
+    return message
+
+
+def render_prompt(query: str, selected) -> str:
+    """Assemble the message for GPT from chunks that have their text attached."""
+    return context_message(selected) + f"\n\nQuestion: {query}"
+
+
+def build_prompt(
+    client,
+    query: str,
+    user_team_id: int = None,
+    model: str = GPT_MODELS[0],
+    token_budget: int = 4096 - 500,
+    filters: dict = None,
+):
+    """
+    Return a message for GPT with the most relevant transcript chunks that fit in the
+    token budget, together with the chunks that were used.
+
+    The message is None when no chunk is within the team's distance threshold; the
+    question is then answered with NO_RESULTS_ANSWER instead of calling the model.
+    """
+    chunks = chunks_ranked_by_relatedness(client, query, user_team_id, filters=filters)
+    max_distance = team_max_distance(user_team_id)
+    if not relevant_chunks(chunks, max_distance):
+        return None, []
+
+    selected = chunk_texts(select_context(
+        query, chunks, model=model, token_budget=token_budget, max_distance=max_distance,
+    ))
+    return render_prompt(query, selected), selected
 
 
 def query_message(
@@ -87,39 +449,65 @@ def query_message(
     user_team_id: int = None,
     model: str = GPT_MODELS[0],
     token_budget: int = 4096 - 500,
+    filters: dict = None,
 ) -> str:
-    """Return a message for GPT, with relevant source texts pulled from a dataframe."""
-    strings = strings_ranked_by_relatedness(client, query, user_team_id)
-    
-    if not strings:
-        return (
-            "You are a helpful assistant that ALWAYS responds in Arabic. The user has asked a question about their meeting transcripts, "
-            "but I couldn't find any relevant meetings in their history. "
-            "Please respond with this message in Arabic: 'عذراً، لم أتمكن من العثور على أي معلومات ذات صلة في سجل اجتماعات فريقك. "
-            "قد يكون ذلك بسبب: \n"
-            "١. لم يتم تسجيل الاجتماع بعد\n"
-            "٢. لم تتم مناقشة الموضوع الذي تسأل عنه في أي من الاجتماعات المسجلة\n"
-            "٣. قد يكون الاجتماع في مساحة عمل فريق آخر\n\n"
-            "يرجى المحاولة:\n"
-            "- إعادة صياغة سؤالك\n"
-            "- التحقق من تسجيل الاجتماع\n"
-            "- التأكد من أنك في مساحة عمل الفريق الصحيح'\n\n"
-            f"Question: {query}"
+    """
+    Return a message for GPT, with the most relevant transcript chunks that fit in the token
+    budget, or None when nothing related to the query was found.
+    """
+    message, _ = build_prompt(client, query, user_team_id, model=model, token_budget=token_budget, filters=filters)
+    return message
+
+
+def answer_messages(message: str):
+    """Chat messages that ask the model to answer from a prompt built by build_prompt."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": message},
+    ]
+
+
+def describe_sources(chunks):
+    """Metadata of the meetings a prompt was built from, in order of first use."""
+    from transcription.models import Meeting
+
+    meeting_ids = list(dict.fromkeys(chunk["meeting_id"] for chunk in chunks))
+    meetings = Meeting.objects.only('id', 'title', 'created_at').in_bulk(meeting_ids)
+    return [
+        {
+            "meeting_id": meeting_id,
+            "title": meetings[meeting_id].title if meeting_id in meetings else None,
+            "created_at": meetings[meeting_id].created_at.isoformat() if meeting_id in meetings else None,
+            "chunks": sorted(chunk["index"] for chunk in chunks if chunk["meeting_id"] == meeting_id),
+        }
+        for meeting_id in meeting_ids
+    ]
+
+
+def uses_answer_cache(user_team_id: int = None, filters: dict = None, answer_cache: bool = True) -> bool:
+    """Whether a question goes through the answer cache; scoped questions do not."""
+    return bool(
+        user_team_id and answer_cache and settings.ANSWER_CACHE_ENABLED and not any((filters or {}).values())
+    )
+
+
+def cached_answer(query_embedding, user_team_id: int, model: str):
+    """Return a recent answer to a near-identical question from the same team, or None."""
+    from .models import AnswerCacheEntry
+
+    entry = (
+        AnswerCacheEntry.objects
+        .filter(
+            team_id=user_team_id,
+            model=model,
+            created_at__gte=timezone.now() - timedelta(seconds=settings.ANSWER_CACHE_TTL),
         )
-    
-    introduction = 'You are a helpful assistant that ALWAYS responds in Arabic. Use the below minutes of meetings to answer the subsequent question. If the answer cannot be found in the summaries, respond in Arabic with: "عذراً، لم أتمكن من العثور على إجابة محددة لسؤالك في محاضر الاجتماعات المتوفرة. هل يمكنك إعادة صياغة سؤالك أو تقديم المزيد من التفاصيل؟"'
-    question = f"\n\nQuestion: {query}"
-    message = introduction
-    for string in strings:
-        next_article = f'\n\nMinutes of Meeting:\n"""\n{string}\n"""'
-        if (
-            num_tokens(message + next_article + question, model=model)
-            > token_budget
-        ):
-            break
-        else:
-            message += next_article
-    return message + question
+        .annotate(distance=CosineDistance('query_embedding', query_embedding))
+        .filter(distance__lte=1 - settings.ANSWER_CACHE_SIMILARITY)
+        .order_by('distance')
+        .first()
+    )
+    return entry.answer if entry else None
 
 
 def ask(
@@ -129,24 +517,409 @@ def ask(
     model: str = GPT_MODELS[0],
     token_budget: int = 4096 - 500,
     print_message: bool = False,
+    filters: dict = None,
+    answer_cache: bool = True,
 ) -> str:
-    """Answers a query using GPT and a dataframe of relevant texts and embeddings."""
-    message = query_message(client, query, user_team_id, model=model, token_budget=token_budget)
+    """
+    Answers a query using GPT and a dataframe of relevant texts and embeddings.
+
+    Answers are cached per team, and a question whose embedding is within
+    ANSWER_CACHE_SIMILARITY of a recent one is answered from the cache. Questions
+    scoped with search filters, or asked with answer_cache=False, bypass the cache.
+    """
+    from .models import AnswerCacheEntry
+
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        query_embedding = embed_query(client, query)
+        answer = cached_answer(query_embedding, user_team_id, model)
+        if answer is not None:
+            return answer
+
+    message = query_message(client, query, user_team_id, model=model, token_budget=token_budget, filters=filters)
+    if message is None:
+        return NO_RESULTS_ANSWER
     if print_message:
         print(message)
-    messages = [
-        {"role": "system", "content": "You are an assistant that ALWAYS responds in Arabic. You answer questions about the minutes of meetings. Even if the question is in English, you must respond in Arabic."},
-        {"role": "user", "content": message},
-    ]
     response = client.chat.completions.create(
+        model=model,
+        messages=answer_messages(message),
+        temperature=0
+    )
+    response_message = response.choices[0].message.content
+
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        AnswerCacheEntry.objects.create(
+            team_id=user_team_id,
+            query=query,
+            query_embedding=query_embedding,
+            model=model,
+            answer=response_message,
+        )
+    return response_message
+
+
+def stream_ask(
+    client,
+    query: str,
+    user_team_id: int = None,
+    model: str = GPT_MODELS[0],
+    token_budget: int = 4096 - 500,
+    filters: dict = None,
+    answer_cache: bool = True,
+):
+    """
+    Answers a query like ask(), as a generator of (event, data) pairs: a "sources" event
+    with the meetings used, one "token" event per streamed piece of the answer, then "done".
+
+    Closing the generator (e.g. when the client disconnects) closes the completion
+    stream, so the model stops generating.
+    """
+    from .models import AnswerCacheEntry
+
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        query_embedding = embed_query(client, query)
+        answer = cached_answer(query_embedding, user_team_id, model)
+        if answer is not None:
+            yield "sources", {"sources": [], "cached": True}
+            yield "token", {"content": answer}
+            yield "done", {}
+            return
+
+    message, selected = build_prompt(
+        client, query, user_team_id, model=model, token_budget=token_budget, filters=filters,
+    )
+    yield "sources", {"sources": describe_sources(selected), "cached": False}
+    if message is None:
+        yield "token", {"content": NO_RESULTS_ANSWER}
+        yield "done", {}
+        return
+
+    stream = client.chat.completions.create(
+        model=model,
+        messages=answer_messages(message),
+        temperature=0,
+        stream=True
+    )
+    parts = []
+    try:
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            parts.append(chunk.choices[0].delta.content)
+            yield "token", {"content": chunk.choices[0].delta.content}
+    finally:
+        stream.close()
+
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        AnswerCacheEntry.objects.create(
+            team_id=user_team_id,
+            query=query,
+            query_embedding=query_embedding,
+            model=model,
+            answer="".join(parts),
+        )
+    yield "done", {}
+
+
+def retrieve_session_context(client, query: str, session, model: str, token_budget: int, filters: dict = None):
+    """
+    Give the session a context for query, reusing the current one unless the question has
+    drifted from the one it was retrieved for. Returns whether a search was made.
+
+    A follow-up that drifted is searched together with the previous question, since it
+    often leans on it ("and what about the budget?").
+    """
+    query_embedding = embed_query(client, query)
+    anchor = session["anchor_embedding"]
+    filters = {field: value for field, value in (filters or {}).items() if value}
+    if filters != session["filters"]:
+        # A new scope always searches again
+        session["filters"] = filters
+        anchor = None
+    if anchor is not None and 1 - spatial.distance.cosine(query_embedding, anchor) >= settings.ASK_SESSION_DRIFT_SIMILARITY:
+        return False
+
+    search_query = query
+    if session["turns"]:
+        previous_question, _ = session["turns"][-1]
+        search_query = f"{previous_question}\n{query}"
+        query_embedding = embed_query(client, search_query)
+
+    chunks = search_similar_embeddings(query_embedding, session["team_id"], query=search_query, **filters)
+    max_distance = team_max_distance(session["team_id"])
+    if relevant_chunks(chunks, max_distance):
+        selected = chunk_texts(select_context(
+            query, chunks, model=model, token_budget=token_budget, max_distance=max_distance,
+        ))
+        session["anchor_embedding"] = list(query_embedding)
+        session["context"] = [
+            {key: chunk[key] for key in ("id", "meeting_id", "index", "token_count", "text")}
+            for chunk in selected
+        ]
+        session["context_tokens"] = count_tokens(context_message(selected), model=model)
+    else:
+        # Nothing to anchor on; the next question searches again
+        session["anchor_embedding"] = None
+        session["context"] = []
+        session["context_tokens"] = 0
+    return True
+
+
+def session_messages(query: str, session, model: str, token_budget: int):
+    """
+    Chat messages for a question in a session, or None when the session has no context.
+
+    The system prompt and the context come first and stay the same while the context is
+    reused, so the provider's prompt cache covers them on follow-ups. The latest turns
+    that fit in the token budget follow, then the question.
+    """
+    if not session["context"]:
+        return None
+
+    question = f"Question: {query}"
+    available = token_budget - session["context_tokens"] - count_tokens(question, model=model)
+    history = []
+    for turn_question, turn_answer in reversed(session["turns"][-settings.ASK_SESSION_MAX_TURNS:]):
+        turn = [
+            {"role": "user", "content": f"Question: {turn_question}"},
+            {"role": "assistant", "content": turn_answer},
+        ]
+        cost = sum(count_tokens(message["content"], model=model) for message in turn)
+        if cost > available:
+            break
+        history = turn + history
+        available -= cost
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": context_message(session["context"])},
+        *history,
+        {"role": "user", "content": question},
+    ]
+
+
+def record_turn(session, query: str, answer: str):
+    """Append a question and its answer to the session and store it."""
+    from .sessions import save_session
+
+    session["turns"] = (session["turns"] + [[query, answer]])[-settings.ASK_SESSION_MAX_TURNS:]
+    save_session(session)
+
+
+def session_ask(
+    client,
+    query: str,
+    session,
+    token_budget: int = 4096 - 500,
+    filters: dict = None,
+) -> str:
+    """
+    Answers a question asked in a session (see interface.sessions). Follow-ups on the same
+    topic reuse the session's context, so they skip the search and the text reads.
+    """
+    model = session["model"]
+    retrieve_session_context(client, query, session, model, token_budget, filters=filters)
+    messages = session_messages(query, session, model, token_budget)
+    if messages is None:
+        answer = NO_RESULTS_ANSWER
+    else:
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0
+        )
+        answer = response.choices[0].message.content
+
+    record_turn(session, query, answer)
+    return answer
+
+
+def session_stream_ask(
+    client,
+    query: str,
+    session,
+    token_budget: int = 4096 - 500,
+    filters: dict = None,
+):
+    """Answers a question asked in a session like session_ask, with the events of stream_ask."""
+    model = session["model"]
+    retrieved = retrieve_session_context(client, query, session, model, token_budget, filters=filters)
+    yield "sources", {
+        "sources": describe_sources(session["context"]),
+        "cached": False,
+        "retrieved": retrieved,
+        "session_id": session["id"],
+    }
+
+    messages = session_messages(query, session, model, token_budget)
+    if messages is None:
+        yield "token", {"content": NO_RESULTS_ANSWER}
+        record_turn(session, query, NO_RESULTS_ANSWER)
+        yield "done", {}
+        return
+
+    stream = client.chat.completions.create(
         model=model,
         messages=messages,
+        temperature=0,
+        stream=True
+    )
+    parts = []
+    try:
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            parts.append(chunk.choices[0].delta.content)
+            yield "token", {"content": chunk.choices[0].delta.content}
+    finally:
+        stream.close()
+
+    record_turn(session, query, "".join(parts))
+    yield "done", {}
+
+
+async def aembed_query(async_client, query: str):
+    """Async version of embed_query, for an AsyncOpenAI client."""
+    key = query_embedding_key(query)
+    query_embedding = await sync_to_async(query_embedding_cache.get)(key)
+    if query_embedding is None:
+        query_embedding_response = await async_client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=query,
+            dimensions=settings.EMBEDDING_DIMENSIONS,
+        )
+        query_embedding = query_embedding_response.data[0].embedding
+        await sync_to_async(query_embedding_cache.set)(key, query_embedding)
+    return query_embedding
+
+
+async def abuild_prompt(
+    async_client,
+    query: str,
+    user_team_id: int = None,
+    model: str = GPT_MODELS[0],
+    token_budget: int = 4096 - 500,
+    query_embedding=None,
+    filters: dict = None,
+):
+    """Async version of build_prompt, for an AsyncOpenAI client."""
+    if query_embedding is None:
+        query_embedding = await aembed_query(async_client, query)
+    chunks = await sync_to_async(search_similar_embeddings)(query_embedding, user_team_id, query=query, **(filters or {}))
+    max_distance = await sync_to_async(team_max_distance)(user_team_id)
+    if not relevant_chunks(chunks, max_distance):
+        return None, []
+
+    selected = select_context(query, chunks, model=model, token_budget=token_budget, max_distance=max_distance)
+    selected = await sync_to_async(chunk_texts)(selected)
+    return render_prompt(query, selected), selected
+
+
+async def aask(
+    async_client,
+    query: str,
+    user_team_id: int = None,
+    model: str = GPT_MODELS[0],
+    token_budget: int = 4096 - 500,
+    filters: dict = None,
+    answer_cache: bool = True,
+) -> str:
+    """Async version of ask, for an AsyncOpenAI client; no worker thread waits on OpenAI."""
+    from .models import AnswerCacheEntry
+
+    query_embedding = None
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        query_embedding = await aembed_query(async_client, query)
+        answer = await sync_to_async(cached_answer)(query_embedding, user_team_id, model)
+        if answer is not None:
+            return answer
+
+    message, _ = await abuild_prompt(
+        async_client, query, user_team_id, model=model, token_budget=token_budget, query_embedding=query_embedding,
+        filters=filters,
+    )
+    if message is None:
+        return NO_RESULTS_ANSWER
+    response = await async_client.chat.completions.create(
+        model=model,
+        messages=answer_messages(message),
         temperature=0
     )
     response_message = response.choices[0].message.content
+
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        await AnswerCacheEntry.objects.acreate(
+            team_id=user_team_id,
+            query=query,
+            query_embedding=query_embedding,
+            model=model,
+            answer=response_message,
+        )
     return response_message
 
 
+async def astream_ask(
+    async_client,
+    query: str,
+    user_team_id: int = None,
+    model: str = GPT_MODELS[0],
+    token_budget: int = 4096 - 500,
+    filters: dict = None,
+    answer_cache: bool = True,
+):
+    """
+    Async version of stream_ask, for an AsyncOpenAI client. If the client disconnects,
+    the ASGI server cancels the generator and the completion stream is closed.
+    """
+    from .models import AnswerCacheEntry
+
+    query_embedding = None
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        query_embedding = await aembed_query(async_client, query)
+        answer = await sync_to_async(cached_answer)(query_embedding, user_team_id, model)
+        if answer is not None:
+            yield "sources", {"sources": [], "cached": True}
+            yield "token", {"content": answer}
+            yield "done", {}
+            return
+
+    message, selected = await abuild_prompt(
+        async_client, query, user_team_id, model=model, token_budget=token_budget, query_embedding=query_embedding,
+        filters=filters,
+    )
+    yield "sources", {"sources": await sync_to_async(describe_sources)(selected), "cached": False}
+    if message is None:
+        yield "token", {"content": NO_RESULTS_ANSWER}
+        yield "done", {}
+        return
+
+    stream = await async_client.chat.completions.create(
+        model=model,
+        messages=answer_messages(message),
+        temperature=0,
+        stream=True
+    )
+    parts = []
+    try:
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            parts.append(chunk.choices[0].delta.content)
+            yield "token", {"content": chunk.choices[0].delta.content}
+    finally:
+        await stream.close()
+
+    if uses_answer_cache(user_team_id, filters, answer_cache):
+        await AnswerCacheEntry.objects.acreate(
+            team_id=user_team_id,
+            query=query,
+            query_embedding=query_embedding,
+            model=model,
+            answer="".join(parts),
+        )
+    yield "done", {}
+
+
 def answer_query(query):
     client = OpenAI()
 
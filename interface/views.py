@@ -1,16 +1,51 @@
+import json
+from asgiref.sync import sync_to_async
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from interface.utils import ask as ask_util
-from openai import OpenAI
+from django.views.decorators.http import require_POST
+from authentication.decorators import async_token_required
+from interface.utils import (ask as ask_util, stream_ask, session_ask, session_stream_ask, aask, astream_ask,
+                             GPT_MODELS)
+from interface.sessions import new_session, load_session
+from interface.filters import search_filters
+from openai import AsyncOpenAI, OpenAI
+
+
+def request_session(request, user_team_id):
+    """
+    The ask session a request continues ("session_id") or starts ("session": true).
+
+    :return: (session, error_response); both are None for a stateless question.
+    """
+    session_id = request.data.get('session_id')
+    if session_id:
+        session = load_session(session_id, request.user.id)
+        if session is None:
+            return None, Response({"error": "Session not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        return session, None
+    if request.data.get('session'):
+        return new_session(request.user.id, user_team_id, GPT_MODELS[0]), None
+    return None, None
 
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def ask(request):
+    """
+    Answer a question about the team's meetings.
+
+    Send "session": true to start a conversation, then the returned "session_id" with
+    follow-up questions so they reuse its context.
+
+    The search can be scoped with "project_ids", "created_after" and "created_before",
+    or with "extract_filters": true to take the project and period from the question.
+    "answer_cache": false answers without the answer cache (e.g. for load tests).
+    """
     # Check if the request body contains the expected data
     if 'query' not in request.data:
         return Response({"error": "No query provided"}, status=status.HTTP_400_BAD_REQUEST)
@@ -20,11 +55,131 @@ def ask(request):
     
     # Get user's team ID
     user_team_id = request.user.team.id if request.user.team else None
-    
+
+    try:
+        filters = search_filters(request.data, query, user_team_id)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    session, error_response = request_session(request, user_team_id)
+    if error_response:
+        return error_response
+
     # Initialize OpenAI client
     client = OpenAI()
-    
+
+    if session:
+        result = session_ask(client, query, session, filters=filters)
+        return Response({"answer": result, "session_id": session["id"]}, status=status.HTTP_200_OK)
+
     # Call ask function with user's team ID
-    result = ask_util(client, query, user_team_id=user_team_id)
+    result = ask_util(
+        client, query, user_team_id=user_team_id, filters=filters,
+        answer_cache=bool(request.data.get('answer_cache', True)),
+    )
 
     return Response({"answer": result}, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def ask_stream(request):
+    """
+    Same as ask, answered as server-sent events: the retrieved sources first, then the
+    answer tokens as they are generated, then a done event. In a session, the sources
+    event carries the "session_id" and whether a new search was made ("retrieved").
+    """
+    if 'query' not in request.data:
+        return Response({"error": "No query provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+    query = request.data['query']
+    user_team_id = request.user.team.id if request.user.team else None
+    try:
+        filters = search_filters(request.data, query, user_team_id)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    session, error_response = request_session(request, user_team_id)
+    if error_response:
+        return error_response
+    client = OpenAI()
+
+    def event_stream():
+        if session:
+            events = session_stream_ask(client, query, session, filters=filters)
+        else:
+            events = stream_ask(
+                client, query, user_team_id=user_team_id, filters=filters,
+                answer_cache=bool(request.data.get('answer_cache', True)),
+            )
+        try:
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        finally:
+            # Runs when the client disconnects, and stops the completion stream
+            events.close()
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Keep nginx from buffering the stream
+    return response
+
+
+async def read_ask_request(request):
+    """
+    Parse the JSON body of an async ask request.
+
+    :return: (query, options, error_response), options being the keyword arguments of aask
+        (filters and answer_cache) and error_response None when the body is valid.
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+    except json.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict) or data.get('query') is None:
+        return None, None, JsonResponse({"error": "No query provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        filters = await sync_to_async(search_filters)(data, data['query'], request.user.team_id)
+    except ValueError as e:
+        return None, None, JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return data['query'], {"filters": filters, "answer_cache": bool(data.get('answer_cache', True))}, None
+
+
+@csrf_exempt
+@require_POST
+@async_token_required
+async def ask_async(request):
+    """
+    Async version of ask for ASGI servers: OpenAI calls are awaited and database access
+    runs off the event loop, so slow completions do not hold a worker thread.
+    """
+    query, options, error_response = await read_ask_request(request)
+    if error_response:
+        return error_response
+
+    # A client per request: its connection pool is bound to the event loop that opens it
+    async with AsyncOpenAI() as client:
+        result = await aask(client, query, user_team_id=request.user.team_id, **options)
+
+    return JsonResponse({"answer": result}, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@require_POST
+@async_token_required
+async def ask_stream_async(request):
+    """Async version of ask_stream for ASGI servers."""
+    query, options, error_response = await read_ask_request(request)
+    if error_response:
+        return error_response
+
+    async def event_stream():
+        async with AsyncOpenAI() as client:
+            async for event, data in astream_ask(client, query, user_team_id=request.user.team_id, **options):
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Keep nginx from buffering the stream
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0002_teammember'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='search_max_distance',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -5,6 +5,8 @@ class Team(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     name = models.CharField(max_length=50, blank=True, null=True)
     company = models.CharField(max_length=50, blank=True, null=True)
+    # Overrides SEARCH_MAX_DISTANCE for the team's questions
+    search_max_distance = models.FloatField(blank=True, null=True)
     last_modified = models.DateTimeField(auto_now=True, editable=False)
 
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Meeting, Project, ActionItem
+from .models import Meeting, Project, ActionItem, PipelineCacheEntry
 import numpy as np
 
 
@@ -7,7 +7,7 @@ def format_embeddings(obj):
     """Format embeddings for display in admin"""
     if obj.embeddings is not None:
         # Convert to list and truncate for display
-        embeddings_list = obj.embeddings.tolist()[:5]  # Show first 5 values
+        embeddings_list = obj.embeddings.to_list()[:5]  # Show first 5 values
         return f"[{', '.join(f'{x:.4f}' for x in embeddings_list)}...]"
     return "No embeddings"
 format_embeddings.short_description = 'Embeddings (truncated)'
@@ -40,6 +40,14 @@ class ActionItemAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
 
 
+class PipelineCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('key', 'stage', 'created_at')
+    search_fields = ['key']
+    list_filter = ['stage']
+    readonly_fields = ['created_at']
+
+
 admin.site.register(Project, ProjectAdmin)
 admin.site.register(Meeting, MeetingAdmin)
 admin.site.register(ActionItem, ActionItemAdmin)
+admin.site.register(PipelineCacheEntry, PipelineCacheEntryAdmin)
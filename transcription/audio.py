@@ -0,0 +1,198 @@
+import bisect
+import os
+import re
+import subprocess
+from pydub.utils import mediainfo
+
+SILENCE_START = re.compile(r'silence_start: (-?[\d.]+)')
+SILENCE_END = re.compile(r'silence_end: (-?[\d.]+)')
+PROGRESS_TIME = re.compile(r'time=(\d+):(\d+):([\d.]+)')
+BITRATE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kKmMgG]?)i?\s*$')
+
+
+def audio_duration(audio_path):
+    """
+    Read the duration of an audio file from its container metadata (ffprobe),
+    without decoding the samples.
+
+    :param audio_path: Path to the audio file.
+    :return: Duration in seconds, or None if it cannot be determined.
+    """
+    try:
+        return float(mediainfo(audio_path).get('duration'))
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_audio(input_path, output_path, sample_rate=16000, bitrate='24k'):
+    """
+    Stream an audio/video file through ffmpeg into a compact speech-only encoding.
+
+    The input is downmixed to mono, resampled with soxr and encoded to Opus. ffmpeg
+    reads and writes in blocks, so the recording is never loaded into memory.
+
+    :param input_path: Path to the source file (e.g. MP4 or high-bitrate MP3).
+    :param output_path: Path of the normalized file (an .ogg container).
+    :param sample_rate: Output sample rate in Hz.
+    :param bitrate: Opus bitrate.
+    :return: output_path.
+    """
+    command = [
+        'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error', '-y',
+        '-i', input_path,
+        '-vn',
+        '-ac', '1',
+        '-af', f'aresample={sample_rate}:resampler=soxr',
+        '-c:a', 'libopus', '-b:a', bitrate, '-application', 'voip',
+        output_path,
+    ]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to normalize {input_path}: {result.stderr.decode(errors='replace').strip()}")
+    return output_path
+
+
+def parse_bitrate(bitrate):
+    """
+    Convert an ffmpeg bitrate ("24k", "64000", "1.5M") to bits per second.
+
+    :raises ValueError: If the bitrate is not a number with an optional k/M/G suffix.
+    """
+    match = BITRATE.match(str(bitrate))
+    if not match:
+        raise ValueError(f"Unrecognized bitrate '{bitrate}'")
+    number, unit = match.groups()
+    return int(float(number) * {'': 1, 'k': 10 ** 3, 'm': 10 ** 6, 'g': 10 ** 9}[unit.lower()])
+
+
+def run_ffmpeg(arguments, description):
+    result = subprocess.run(
+        ['ffmpeg', '-nostdin', '-hide_banner', *arguments], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to {description}: {result.stderr.decode(errors='replace').strip()}")
+    return result.stderr.decode(errors='replace')
+
+
+def parse_silences(ffmpeg_log, duration=None):
+    """
+    Read the pauses reported by ffmpeg's silencedetect filter.
+
+    :param ffmpeg_log: stderr of the ffmpeg run.
+    :param duration: Length of the audio in seconds; a pause still open at the end lasts until it.
+    :return: (silences, duration), silences being (start_ms, end_ms) pairs in order, and duration
+        the given one or, when None, the last progress time ffmpeg reported (in seconds).
+    """
+    if duration is None:
+        times = PROGRESS_TIME.findall(ffmpeg_log)
+        if times:
+            hours, minutes, seconds = times[-1]
+            duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    silences = []
+    start = None
+    for line in ffmpeg_log.splitlines():
+        match = SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((int(start * 1000), int(float(match.group(1)) * 1000)))
+            start = None
+    if start is not None and duration is not None:
+        silences.append((int(start * 1000), int(duration * 1000)))
+    return silences, duration
+
+
+def detect_silences(audio_path, silence_thresh_db=-35, min_silence_len=500):
+    """
+    Find the pauses of a recording with ffmpeg's silencedetect filter. The audio is
+    decoded as a stream, so memory use does not grow with the recording's length.
+
+    :param silence_thresh_db: Level (dBFS) below which audio counts as silence.
+    :param min_silence_len: Minimum pause length (ms).
+    :return: (silences, duration) as returned by parse_silences.
+    """
+    log = run_ffmpeg([
+        '-i', audio_path, '-vn', '-ac', '1',
+        '-af', f'silencedetect=noise={silence_thresh_db}dB:d={min_silence_len / 1000}',
+        '-f', 'null', '-',
+    ], f"detect silence in {audio_path}")
+    return parse_silences(log, audio_duration(audio_path))
+
+
+def find_split_points(silences, duration_ms, max_chunk_ms, search_window_ms=30000, min_silence_len=500):
+    """
+    Find cut offsets so that no chunk is longer than max_chunk_ms, preferring to cut in silence.
+
+    Only pauses in the last search_window_ms before each hard limit are considered.
+
+    :param silences: Sorted (start_ms, end_ms) pauses, e.g. from detect_silences.
+    :param duration_ms: Length of the audio in milliseconds.
+    :param max_chunk_ms: Maximum chunk length in milliseconds.
+    :param search_window_ms: How far back from the limit to look for a pause.
+    :param min_silence_len: Minimum part of a pause (ms) that must fall inside the window.
+    :return: Sorted list of cut offsets in milliseconds.
+    """
+    starts = [start for start, _ in silences]
+
+    cuts = []
+    start = 0
+    while duration_ms - start > max_chunk_ms:
+        limit = start + max_chunk_ms
+        window_start = max(start + 1, limit - search_window_ms)
+        cut = limit
+        # Cut in the middle of the last pause before the limit, clipped to the window
+        for silence_start, silence_end in reversed(silences[:bisect.bisect_left(starts, limit)]):
+            if silence_end <= window_start:
+                break
+            silence_start, silence_end = max(silence_start, window_start), min(silence_end, limit)
+            if silence_end - silence_start >= min_silence_len:
+                cut = (silence_start + silence_end) // 2
+                break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def split_audio_at_silence(audio_path, output_dir, max_chunk_seconds, max_chunk_bytes=None,
+                           export_format='ogg', codec='libopus', bitrate='24k'):
+    """
+    Split an audio file at silence boundaries into size-bounded chunk files.
+
+    Pauses are found and chunks cut by ffmpeg, reading the recording as a stream
+    instead of decoding it into memory.
+
+    :param audio_path: Path to the audio file.
+    :param output_dir: Directory where the chunk files are written.
+    :param max_chunk_seconds: Maximum duration of each chunk.
+    :param max_chunk_bytes: Optional upper bound on each exported chunk's size.
+    :param export_format: Container of the exported chunks.
+    :param codec: Codec of the exported chunks.
+    :param bitrate: Bitrate of the exported chunks, passed to ffmpeg as is.
+    :return: List of {"path", "offset"} dicts, offset being the chunk start in seconds.
+    """
+    max_chunk_ms = int(max_chunk_seconds * 1000)
+    if max_chunk_bytes:
+        # Keep the encoded chunk under the byte limit at the export bitrate
+        max_chunk_ms = min(max_chunk_ms, int(max_chunk_bytes * 8 / parse_bitrate(bitrate) * 1000))
+
+    silences, duration = detect_silences(audio_path)
+    if duration is None:
+        raise RuntimeError(f"Could not determine the duration of {audio_path}")
+    duration_ms = int(duration * 1000)
+    cuts = find_split_points(silences, duration_ms, max_chunk_ms)
+    boundaries = [0] + cuts + [duration_ms]
+
+    chunks = []
+    for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+        chunk_path = os.path.join(output_dir, f"chunk_{index:04d}.{export_format}")
+        run_ffmpeg([
+            '-loglevel', 'error', '-y',
+            '-ss', f'{start / 1000:.3f}', '-t', f'{(end - start) / 1000:.3f}', '-i', audio_path,
+            '-vn', '-ac', '1', '-c:a', codec, '-b:a', bitrate,
+            chunk_path,
+        ], f"cut {audio_path}")
+        chunks.append({"path": chunk_path, "offset": start / 1000})
+    return chunks
@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from django.conf import settings
+from openai import OpenAI
+
+
+class TranscriptionBackend:
+    """
+    Speech-to-text engine used by transcribe_audio.
+
+    Subclasses implement transcribe(); transcribe_batch() may be overridden when the
+    engine can decode several chunks more efficiently than one at a time.
+    """
+    name = None
+    # Whether long recordings should be split into chunks before transcription
+    chunked = True
+    # Number of CPU threads the engine decodes with, when it runs locally
+    cpu_threads = None
+
+    def transcribe(self, audio_path, offset=0.0):
+        """
+        Transcribe a single audio file.
+
+        :param audio_path: Path to the audio file.
+        :param offset: Seconds added to every segment timestamp (start of the chunk in the full recording).
+        :return: Transcription segments with timestamps.
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(self, chunks):
+        """
+        Transcribe a list of {"path", "offset"} chunks.
+
+        :return: One list of segments per chunk, in chunk order.
+        """
+        return [self.transcribe(chunk["path"], offset=chunk["offset"]) for chunk in chunks]
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Transcription through the OpenAI Whisper API, with chunks uploaded concurrently."""
+    name = 'openai'
+
+    def __init__(self):
+        self.client = OpenAI()
+
+    def transcribe(self, audio_path, offset=0.0):
+        with open(audio_path, "rb") as audio_file:
+            transcript = self.client.audio.transcriptions.create(
+                file=audio_file,
+                model="whisper-1",
+                response_format="verbose_json",
+                timestamp_granularities=["segment"]
+            )
+
+        # Process the response to extract segments and timestamps
+        transcription_segments = []
+        for segment in transcript.segments:
+            transcription_segments.append({
+                "start": segment.start + offset,
+                "end": segment.end + offset,
+                "text": segment.text
+            })
+
+        return transcription_segments
+
+    def transcribe_batch(self, chunks):
+        with ThreadPoolExecutor(max_workers=settings.TRANSCRIPTION_MAX_WORKERS) as executor:
+            # map() keeps chunk order, so segments come back sorted by time
+            return list(executor.map(
+                lambda chunk: self.transcribe(chunk["path"], offset=chunk["offset"]),
+                chunks,
+            ))
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Transcription on the worker's CPU with a CTranslate2 Whisper model (faster-whisper).
+
+    The recording is split into voice-activity chunks by the engine itself and the
+    chunks are decoded together in batches, so no upload-size chunking is needed.
+    """
+    name = 'local'
+    chunked = False
+
+    def __init__(self):
+        try:
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
+        except ImportError:
+            raise ImportError("The local transcription backend requires the faster-whisper package.")
+
+        self.cpu_threads = settings.LOCAL_WHISPER_CPU_THREADS or None
+        model = WhisperModel(
+            settings.LOCAL_WHISPER_MODEL,
+            device='cpu',
+            compute_type=settings.LOCAL_WHISPER_COMPUTE_TYPE,
+            cpu_threads=settings.LOCAL_WHISPER_CPU_THREADS,
+        )
+        self.pipeline = BatchedInferencePipeline(model=model)
+
+    def transcribe(self, audio_path, offset=0.0):
+        segments, info = self.pipeline.transcribe(
+            audio_path,
+            batch_size=settings.LOCAL_WHISPER_BATCH_SIZE,
+        )
+        return [
+            {
+                "start": segment.start + offset,
+                "end": segment.end + offset,
+                "text": segment.text
+            }
+            for segment in segments
+        ]
+
+
+TRANSCRIPTION_BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_transcription_backend(name=None):
+    """
+    Return the transcription backend selected by TRANSCRIPTION_BACKEND.
+
+    Instances are cached per process so local models are only loaded once.
+    """
+    name = name or settings.TRANSCRIPTION_BACKEND
+    try:
+        backend_class = TRANSCRIPTION_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend '{name}'. Choose from: {', '.join(TRANSCRIPTION_BACKENDS)}")
+    return backend_class()
@@ -0,0 +1,69 @@
+import hashlib
+
+
+def file_sha256(file):
+    """
+    Compute the SHA-256 of an uploaded or stored file, reading it in chunks.
+
+    :param file: Django File (e.g. UploadedFile or FieldFile).
+    :return: Hex digest.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_stage(stage, version, content_hash, compute):
+    """
+    Return the result of a pipeline stage for some content, computing and storing it on a miss.
+
+    Results are keyed on the content hash plus a version string that must change
+    whenever the model or prompt behind the stage changes.
+
+    :param stage: Stage name, e.g. "transcript".
+    :param version: Model/prompt version of the stage.
+    :param content_hash: Hash of the stage's input (the audio bytes).
+    :param compute: Zero-argument callable producing a JSON-serializable result.
+    :return: The cached or freshly computed result.
+    """
+    from .models import PipelineCacheEntry
+
+    if not content_hash:
+        return compute()
+
+    key = f"{stage}:{version}:{content_hash}"
+    entry = PipelineCacheEntry.objects.filter(key=key).first()
+    if entry is not None:
+        print(f"Cache hit for {stage} stage ({key})")
+        return entry.result
+
+    result = compute()
+    PipelineCacheEntry.objects.update_or_create(key=key, defaults={'stage': stage, 'result': result})
+    return result
+
+
+def checkpointed_stage(meeting, stage, compute):
+    """
+    Return a stage result checkpointed on the meeting, computing and persisting it if missing.
+
+    Checkpoints are written with a queryset update right after each stage, so a
+    retry after a later failure resumes from the first stage that did not finish.
+    They are cleared once the task succeeds.
+
+    :param meeting: Meeting being processed.
+    :param stage: Stage name, e.g. "segments".
+    :param compute: Zero-argument callable producing a JSON-serializable result.
+    :return: The checkpointed or freshly computed result.
+    """
+    from .models import Meeting
+
+    if stage in meeting.pipeline_checkpoints:
+        print(f"Skipping {stage} stage for meeting {meeting.pk}, already checkpointed")
+        return meeting.pipeline_checkpoints[stage]
+
+    result = compute()
+    meeting.pipeline_checkpoints[stage] = result
+    # update() rather than save(): Meeting.save has processing side effects
+    Meeting.objects.filter(pk=meeting.pk).update(pipeline_checkpoints=meeting.pipeline_checkpoints)
+    return result
@@ -0,0 +1,74 @@
+import os
+import resource
+import sys
+import threading
+import time
+import torch
+from celery.signals import worker_process_init
+from django.conf import settings
+from pyannote.audio import Pipeline
+
+
+# One pipeline per worker process, loaded once and reused for every meeting
+_diarization_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def resident_memory_mb():
+    """
+    Return the current resident memory of this process in MB, from /proc/self/statm.
+    Where /proc is not available, fall back to the peak resident memory.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def configure_torch_threads():
+    """Apply the per-worker torch thread settings, if configured."""
+    if settings.DIARIZATION_TORCH_THREADS:
+        torch.set_num_threads(settings.DIARIZATION_TORCH_THREADS)
+    if settings.DIARIZATION_TORCH_INTEROP_THREADS:
+        try:
+            torch.set_num_interop_threads(settings.DIARIZATION_TORCH_INTEROP_THREADS)
+        except RuntimeError:
+            # Can only be set before torch starts any inter-op parallel work
+            print("Torch inter-op threads already initialized, keeping the current value")
+
+
+def get_diarization_pipeline():
+    """
+    Return this process's diarization pipeline, loading it on first use.
+
+    :return: Pre-loaded Pyannote pipeline.
+    """
+    global _diarization_pipeline
+    if _diarization_pipeline is None:
+        with _pipeline_lock:
+            if _diarization_pipeline is None:
+                memory_before = resident_memory_mb()
+                started = time.perf_counter()
+                _diarization_pipeline = Pipeline.from_pretrained(
+                    settings.DIARIZATION_MODEL,
+                    use_auth_token=settings.DIARIZATION_AUTH_TOKEN,
+                )
+                print(
+                    f"Loaded diarization pipeline {settings.DIARIZATION_MODEL} in "
+                    f"{time.perf_counter() - started:.1f}s "
+                    f"(resident memory {memory_before:.0f} MB -> {resident_memory_mb():.0f} MB, "
+                    f"torch threads {torch.get_num_threads()})"
+                )
+    return _diarization_pipeline
+
+
+@worker_process_init.connect
+def warm_diarization_pipeline(**kwargs):
+    """Load the diarization model when a Celery worker process starts, not on its first meeting."""
+    if settings.TRANSCRIPTION_DIARIZATION_ENABLED:
+        configure_torch_threads()
+        get_diarization_pipeline()
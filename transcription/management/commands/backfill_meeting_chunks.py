@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from transcription.models import Meeting, PipelineCacheEntry
+from transcription.tasks import store_meeting_chunks
+from transcription.utils import chunk_embedding_pipeline, format_transcript, transcription_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Chunk and embed completed meetings that have no MeetingChunk rows (processed before "
+        "chunk-level search). Uses the transcript when its segments are still cached, otherwise "
+        "the stored summary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help="Process at most this many meetings")
+        parser.add_argument('--dry-run', action='store_true', help="Only list the meetings that would be processed")
+
+    def handle(self, *args, **options):
+        meetings = (
+            Meeting.objects
+            .filter(status='completed', chunks__isnull=True)
+            .only('id', 'title', 'summary', 'audio_hash', 'embeddings')
+            .order_by('id')
+        )
+        if options['limit']:
+            meetings = meetings[:options['limit']]
+
+        done = skipped = 0
+        for meeting in meetings:
+            text, source = self.meeting_text(meeting)
+            if not text:
+                self.stdout.write(f"Meeting {meeting.pk}: no transcript or summary, skipped")
+                skipped += 1
+                continue
+            if options['dry_run']:
+                self.stdout.write(f"Meeting {meeting.pk}: would chunk its {source}")
+                continue
+
+            chunks = chunk_embedding_pipeline(text)
+            store_meeting_chunks(meeting, chunks)
+            if meeting.embeddings is None:
+                # update() rather than save(): Meeting.save has processing side effects
+                Meeting.objects.filter(pk=meeting.pk).update(embeddings=chunks[0]['embedding'])
+            self.stdout.write(f"Meeting {meeting.pk}: {len(chunks)} chunks from its {source}")
+            done += 1
+
+        self.stdout.write(f"Backfilled {done} meetings, skipped {skipped}")
+
+    @staticmethod
+    def meeting_text(meeting):
+        """The text to chunk for a meeting and where it came from."""
+        if meeting.audio_hash:
+            entry = PipelineCacheEntry.objects.filter(
+                key=f"segments:{transcription_version()}:{meeting.audio_hash}",
+            ).first()
+            if entry is not None:
+                return format_transcript(entry.result), "transcript"
+        return meeting.summary, "summary"
@@ -0,0 +1,93 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from transcription.tokenizer import get_encoding
+from transcription.utils import split_strings, truncated_string
+
+
+WORDS = ["الاجتماع", "المشروع", "الموعد", "التسليم", "الميزانية", "الفريق", "العميل", "التقرير",
+         "نعم", "لا", "سوف", "نناقش", "المرحلة", "الثانية", "الأسبوع", "القادم", "2025", "KPI"]
+
+
+def legacy_split_strings(string, encoding, max_tokens, max_recursion=5):
+    """The previous recursive halving splitter, kept here as the benchmark baseline."""
+    def count(text):
+        return len(encoding.encode(text))
+
+    def halved(text, delimiter):
+        chunks = text.split(delimiter)
+        if len(chunks) == 1:
+            return [text, ""]
+        if len(chunks) == 2:
+            return chunks
+        halfway = count(text) // 2
+        best_diff = halfway
+        for i, chunk in enumerate(chunks):
+            diff = abs(halfway - count(delimiter.join(chunks[: i + 1])))
+            if diff >= best_diff:
+                break
+            best_diff = diff
+        return [delimiter.join(chunks[:i]), delimiter.join(chunks[i:])]
+
+    if count(string) <= max_tokens:
+        return [string]
+    if max_recursion == 0:
+        return [truncated_string(string, model='gpt-4o-mini', max_tokens=max_tokens, print_warning=False)]
+    for delimiter in ["\n\n", "\n", ". "]:
+        left, right = halved(string, delimiter)
+        if left and right:
+            return (legacy_split_strings(left, encoding, max_tokens, max_recursion - 1)
+                    + legacy_split_strings(right, encoding, max_tokens, max_recursion - 1))
+    return [truncated_string(string, model='gpt-4o-mini', max_tokens=max_tokens, print_warning=False)]
+
+
+def synthetic_transcript(minutes, words_per_minute=130, seed=0):
+    """Build a transcript of speaker turns roughly as long as a meeting of the given length."""
+    rng = random.Random(seed)
+    turns = []
+    remaining = minutes * words_per_minute
+    while remaining > 0:
+        length = min(remaining, rng.randint(5, 60))
+        speaker = f"SPEAKER_{rng.randint(0, 5):02d}"
+        turns.append(f"{speaker}: " + " ".join(rng.choice(WORDS) for _ in range(length)))
+        remaining -= length
+    return "\n".join(turns)
+
+
+class Command(BaseCommand):
+    help = "Compare the single-pass transcript splitter with the previous recursive splitter"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help="Transcript to split (defaults to a synthetic 2-hour meeting)")
+        parser.add_argument('--minutes', type=int, default=120, help="Length of the synthetic meeting")
+        parser.add_argument('--max-tokens', type=int, default=1600)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as file:
+                transcript = file.read()
+        else:
+            transcript = synthetic_transcript(options['minutes'])
+
+        encoding = get_encoding('gpt-4o-mini')
+        self.stdout.write(f"Transcript: {len(transcript)} characters, {len(encoding.encode(transcript))} tokens")
+
+        timings = {}
+        for name, split in [
+            ('single-pass', lambda: split_strings(transcript, max_tokens=options['max_tokens'])),
+            ('legacy', lambda: legacy_split_strings(transcript, encoding, options['max_tokens'])),
+        ]:
+            best = float('inf')
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                chunks = split()
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best
+            sizes = [len(encoding.encode(chunk)) for chunk in chunks]
+            self.stdout.write(
+                f"{name:>12}: {best * 1000:8.1f} ms, {len(chunks)} chunks, "
+                f"{min(sizes)}-{max(sizes)} tokens per chunk"
+            )
+
+        self.stdout.write(f"Speedup: {timings['legacy'] / timings['single-pass']:.1f}x")
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+
+# (table, column, nullable) of every halfvec column sized by EMBEDDING_DIMENSIONS
+VECTOR_COLUMNS = [
+    ('transcription_meeting', 'embeddings', True),
+    ('transcription_meetingchunk', 'embedding', False),
+    ('interface_answercacheentry', 'query_embedding', False),
+]
+BIT_INDEX = 'meetingchunk_embedding_bit_hnsw'
+
+
+class Command(BaseCommand):
+    help = (
+        "Resize the stored embeddings to EMBEDDING_DIMENSIONS. Shrinking keeps the leading "
+        "components of each vector and re-normalizes them, which is what text-embedding-3 returns "
+        "for the smaller size. Growing deletes the chunks, to be re-embedded with "
+        "backfill_meeting_chunks. Afterwards run makemigrations for transcription and interface "
+        "and apply the new migrations with migrate --fake, since the columns already match."
+    )
+
+    def handle(self, *args, **options):
+        dimensions = int(settings.EMBEDDING_DIMENSIONS)
+        current = self.column_dimensions('transcription_meetingchunk', 'embedding')
+        if current == dimensions:
+            self.stdout.write(f"Embeddings already have {dimensions} dimensions")
+            return
+        if dimensions < 1:
+            raise CommandError("EMBEDDING_DIMENSIONS must be positive")
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DROP INDEX IF EXISTS {BIT_INDEX};")
+            # Cached answers are cheap to lose
+            cursor.execute("DELETE FROM interface_answercacheentry;")
+            if dimensions > current:
+                # Vectors cannot be grown; their meetings are re-embedded from text
+                cursor.execute("DELETE FROM transcription_meetingchunk;")
+                cursor.execute("UPDATE transcription_meeting SET embeddings = NULL;")
+
+            for table, column, _ in VECTOR_COLUMNS:
+                cursor.execute(
+                    f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE halfvec({dimensions}) '
+                    f'USING l2_normalize(subvector("{column}", 1, {dimensions}))::halfvec({dimensions});'
+                )
+            cursor.execute(
+                f"CREATE INDEX {BIT_INDEX} ON transcription_meetingchunk USING hnsw "
+                f"((binary_quantize(embedding)::bit({dimensions})) bit_hamming_ops) WITH (m = 16, ef_construction = 64);"
+            )
+
+        self.stdout.write(f"Re-encoded embeddings from {current} to {dimensions} dimensions")
+        if dimensions > current:
+            self.stdout.write("Chunks were deleted: run backfill_meeting_chunks to re-embed the meetings")
+        self.stdout.write(
+            "Now run makemigrations transcription interface and apply the result with migrate --fake"
+        )
+
+    @staticmethod
+    def column_dimensions(table, column):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT atttypmod FROM pg_attribute WHERE attrelid = %s::regclass AND attname = %s;",
+                [table, column],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise CommandError(f"{table}.{column} does not exist; run migrate first")
+        return row[0]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0006_meeting_audio_hash_pipelinecacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='pipeline_checkpoints',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0007_meeting_pipeline_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='summary_progress',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
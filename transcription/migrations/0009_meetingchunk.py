@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:00
+
+import django.db.models.deletion
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0008_meeting_summary_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('token_count', models.PositiveIntegerField()),
+                ('start_offset', models.PositiveIntegerField()),
+                ('end_offset', models.PositiveIntegerField()),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=1536)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='transcription.meeting')),
+            ],
+            options={
+                'ordering': ['meeting', 'index'],
+                'indexes': [pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='meetingchunk_embedding_hnsw', opclasses=['vector_l2_ops'])],
+            },
+        ),
+    ]
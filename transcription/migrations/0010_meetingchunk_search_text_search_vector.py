@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def normalize_search_text(apps, schema_editor):
+    from transcription.text import normalize_arabic
+
+    MeetingChunk = apps.get_model('transcription', 'MeetingChunk')
+    chunks = list(MeetingChunk.objects.only('id', 'text'))
+    for chunk in chunks:
+        chunk.search_text = normalize_arabic(chunk.text)
+    MeetingChunk.objects.bulk_update(chunks, ['search_text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0009_meetingchunk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingchunk',
+            name='search_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='meetingchunk',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='meetingchunk',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='meetingchunk_search_vector_gin'),
+        ),
+        migrations.RunPython(normalize_search_text, migrations.RunPython.noop),
+        migrations.RunSQL(
+            "UPDATE transcription_meetingchunk SET search_vector = to_tsvector('simple', search_text);",
+            migrations.RunSQL.noop,
+        ),
+    ]
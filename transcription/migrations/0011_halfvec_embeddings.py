@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:30
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import pgvector.django.bit
+import pgvector.django.halfvec
+import pgvector.django.indexes
+import transcription.vectors
+from django.db import migrations
+
+# Requires pgvector >= 0.7 (halfvec, subvector, l2_normalize, binary_quantize). Later
+# changes of EMBEDDING_DIMENSIONS go through the reencode_embeddings command.
+DIMENSIONS = 1536
+
+
+def reencode_sql(table, column):
+    # Shortened text-embedding-3 vectors are the leading components, L2-normalized again
+    return (
+        f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE halfvec({DIMENSIONS}) '
+        f'USING l2_normalize(subvector("{column}", 1, {DIMENSIONS}))::halfvec({DIMENSIONS});'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0010_meetingchunk_search_text_search_vector'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='meetingchunk',
+            name='meetingchunk_embedding_hnsw',
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(reencode_sql('transcription_meeting', 'embeddings')),
+                migrations.RunSQL(reencode_sql('transcription_meetingchunk', 'embedding')),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='meeting',
+                    name='embeddings',
+                    field=pgvector.django.halfvec.HalfVectorField(blank=True, dimensions=DIMENSIONS, null=True),
+                ),
+                migrations.AlterField(
+                    model_name='meetingchunk',
+                    name='embedding',
+                    field=pgvector.django.halfvec.HalfVectorField(dimensions=DIMENSIONS),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='meetingchunk',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='meetingchunk_embedding_hnsw', opclasses=['halfvec_l2_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='meetingchunk',
+            index=pgvector.django.indexes.HnswIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.comparison.Cast(transcription.vectors.BinaryQuantize('embedding'), pgvector.django.bit.BitField(length=DIMENSIONS)), name='bit_hamming_ops'), ef_construction=64, m=16, name='meetingchunk_embedding_bit_hnsw'),
+        ),
+    ]
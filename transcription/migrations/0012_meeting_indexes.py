@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0011_halfvec_embeddings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['project', 'created_at'], name='meeting_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['created_at'], name='meeting_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0012_meeting_indexes'),
+    ]
+
+    operations = [
+        # Checkpoints of finished meetings duplicate MeetingChunk and the pipeline cache
+        migrations.RunSQL(
+            "UPDATE transcription_meeting SET pipeline_checkpoints = '{}' WHERE status = 'completed';",
+            migrations.RunSQL.noop,
+        ),
+    ]
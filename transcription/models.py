@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.db import models
-from pgvector.django import VectorField
+from django.db.models.functions import Cast
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from pgvector.django import BitField, HalfVectorField, HnswIndex
 from transcription.tasks import process_meeting_uploaded_file
+from transcription.vectors import BinaryQuantize
 from teams.models import Team
 import datetime
 
@@ -22,11 +27,23 @@ class Meeting(models.Model):
     project = models.ForeignKey(Project, related_name='project', on_delete=models.CASCADE, null=True)
     audio_file = models.FileField(upload_to='uploads/')
     transcription_file = models.FileField(upload_to='uploads/', blank=True, null=True)
-    embeddings = VectorField(dimensions=1536, blank=True, null=True)
+    embeddings = HalfVectorField(dimensions=settings.EMBEDDING_DIMENSIONS, blank=True, null=True)
     status = models.CharField(max_length=20, choices=[('pending', 'Pending'), ('completed', 'Completed')],
                               default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     summary = models.TextField(blank=True, null=True)
+    # Minutes written so far while the summary is being generated
+    summary_progress = models.TextField(blank=True, null=True)
+    audio_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    # Output of each completed processing stage, so retries resume where they failed
+    pipeline_checkpoints = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            # Project and period predicates of scoped meeting search
+            models.Index(name='meeting_project_created_idx', fields=['project', 'created_at']),
+            models.Index(name='meeting_created_idx', fields=['created_at']),
+        ]
 
     def save(self, *args, **kwargs):
         # Check if this is a new meeting with audio file
@@ -37,8 +54,9 @@ class Meeting(models.Model):
         else:
             # If summary is being updated, update embeddings
             if self.pk:  # Only for existing meetings
-                old_meeting = Meeting.objects.get(pk=self.pk)
-                if old_meeting.summary != self.summary:
+                old_meeting = Meeting.objects.only('status', 'summary').get(pk=self.pk)
+                # Only for edits of a processed meeting; the pipeline sets its own embeddings
+                if old_meeting.status == 'completed' and old_meeting.summary != self.summary:
                     from .utils import embedding_pipeline
                     self.embeddings = embedding_pipeline(self.summary)
             super(Meeting, self).save(*args, **kwargs)
@@ -54,3 +72,54 @@ class ActionItem(models.Model):
 
     def __str__(self):
         return f"{self.text[:50]}..."
+
+
+class MeetingChunk(models.Model):
+    """A token-bounded piece of a meeting transcript and its embedding, the unit of search."""
+    meeting = models.ForeignKey(Meeting, related_name='chunks', on_delete=models.CASCADE)
+    index = models.PositiveIntegerField()
+    text = models.TextField()
+    token_count = models.PositiveIntegerField()
+    start_offset = models.PositiveIntegerField()
+    end_offset = models.PositiveIntegerField()
+    embedding = HalfVectorField(dimensions=settings.EMBEDDING_DIMENSIONS)
+    # Arabic-normalized text and its tsvector, for lexical search next to the vector
+    search_text = models.TextField(default='', blank=True)
+    search_vector = SearchVectorField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['meeting', 'index']
+        indexes = [
+            GinIndex(name='meetingchunk_search_vector_gin', fields=['search_vector']),
+            HnswIndex(
+                name='meetingchunk_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['halfvec_l2_ops'],
+            ),
+            # One bit per dimension, for VECTOR_SEARCH_MODE = 'binary' (a 16th of the halfvec index)
+            HnswIndex(
+                OpClass(
+                    Cast(BinaryQuantize('embedding'), BitField(length=settings.EMBEDDING_DIMENSIONS)),
+                    name='bit_hamming_ops',
+                ),
+                name='meetingchunk_embedding_bit_hnsw',
+                m=16,
+                ef_construction=64,
+            ),
+        ]
+
+    def __str__(self):
+        return f"Meeting {self.meeting_id} chunk {self.index}"
+
+
+class PipelineCacheEntry(models.Model):
+    """Result of a processing stage, keyed on stage, model/prompt version and audio hash."""
+    key = models.CharField(max_length=255, unique=True)
+    stage = models.CharField(max_length=50)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.key
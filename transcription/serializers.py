@@ -38,8 +38,8 @@ class MeetingSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Meeting
-        fields = ['id', 'title', 'project', 'audio_file', 'transcription_file', 'embeddings', 'status', 'timestamp', 'created_at', 'summary', 'action_items']
-        read_only_fields = ['audio_file', 'transcription_file', 'embeddings', 'status', 'timestamp', 'action_items']
+        fields = ['id', 'title', 'project', 'audio_file', 'transcription_file', 'status', 'timestamp', 'created_at', 'summary', 'summary_progress', 'action_items']
+        read_only_fields = ['audio_file', 'transcription_file', 'status', 'timestamp', 'summary_progress', 'action_items']
 
 
 class MeetingUpdateSerializer(serializers.ModelSerializer):
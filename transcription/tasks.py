@@ -1,17 +1,52 @@
 from celery import shared_task
+from django.contrib.postgres.search import SearchVector
 from django.core.files.base import ContentFile
-from .utils import transcription_pipeline, summarize, embedding_pipeline
+from openai import APIError
+from .utils import (transcribe_segments, format_transcript, summarize, chunk_embedding_pipeline, transcription_version,
+                    summary_version, chunk_version)
+from .cache import cached_stage, checkpointed_stage, file_sha256
+from .text import normalize_arabic
+from .tokenizer import tokens_processed
 from datetime import datetime
 import uuid
 
 
-@shared_task
+def store_meeting_chunks(meeting, chunks):
+    """Replace a meeting's chunks with chunk_embedding_pipeline output, with their search vectors."""
+    from .models import MeetingChunk
+
+    MeetingChunk.objects.filter(meeting=meeting).delete()
+    MeetingChunk.objects.bulk_create([
+        MeetingChunk(meeting=meeting, search_text=normalize_arabic(chunk['text']), **chunk)
+        for chunk in chunks
+    ])
+    MeetingChunk.objects.filter(meeting=meeting).update(search_vector=SearchVector('search_text', config='simple'))
+
+
+@shared_task(autoretry_for=(APIError,), retry_backoff=True, max_retries=5)
 def process_meeting_uploaded_file(meeting_id):
     from .models import Meeting, ActionItem
     meeting = Meeting.objects.get(id=meeting_id)
+    tokens_before = tokens_processed()
+
+    # Duplicate uploads share the same hash and reuse every cached stage result
+    if not meeting.audio_hash:
+        meeting.audio_hash = file_sha256(meeting.audio_file)
 
-    transcription = transcription_pipeline(meeting.audio_file.path)
-    summary, meeting_title, action_items = summarize(transcription, project=meeting.project)
+    def save_summary_progress(partial_summary):
+        Meeting.objects.filter(pk=meeting.pk).update(summary_progress=partial_summary)
+
+    # Each stage is checkpointed on the meeting, so a retry skips the stages that already completed
+    segments = checkpointed_stage(meeting, 'segments', lambda: cached_stage(
+        'segments', transcription_version(), meeting.audio_hash,
+        lambda: transcribe_segments(meeting.audio_file.path),
+    ))
+    transcription = checkpointed_stage(meeting, 'transcript', lambda: format_transcript(segments))
+    summary, meeting_title, action_items = checkpointed_stage(meeting, 'summary', lambda: cached_stage(
+        'summary', f"{summary_version(meeting.project)}:{transcription_version()}",
+        meeting.audio_hash,
+        lambda: summarize(transcription, project=meeting.project, on_progress=save_summary_progress),
+    ))
     
     # Create a unique filename using timestamp and UUID
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -21,18 +56,33 @@ def process_meeting_uploaded_file(meeting_id):
     meeting.transcription_file.save(filename, ContentFile(summary), save=False)
     meeting.title = meeting_title
     meeting.summary = summary  # Save the summary in the model
+    meeting.summary_progress = None
 
-    embeddings = embedding_pipeline(transcription)
-    meeting.embeddings = embeddings
+    chunks = checkpointed_stage(meeting, 'chunks', lambda: cached_stage(
+        'chunks', f"{chunk_version()}:{transcription_version()}", meeting.audio_hash,
+        lambda: chunk_embedding_pipeline(transcription),
+    ))
+    store_meeting_chunks(meeting, chunks)
+    meeting.embeddings = chunks[0]['embedding']
 
     meeting.status = 'completed'
     meeting.save()
 
-    # Create action items
-    for action_item in action_items:
-        ActionItem.objects.create(
-            text=action_item['text'],
-            due_by=None,
-            completed=False,
-            meeting=meeting
-        )
+    # Create action items, unless a previous run already got this far
+    if not meeting.action_items.exists():
+        for action_item in action_items:
+            ActionItem.objects.create(
+                text=action_item['text'],
+                due_by=None,
+                completed=False,
+                meeting=meeting
+            )
+
+    # The results live on in MeetingChunk and the pipeline cache; checkpoints only serve retries
+    Meeting.objects.filter(pk=meeting.pk).update(pipeline_checkpoints={})
+
+    tokens = {
+        model: count - tokens_before.get(model, 0)
+        for model, count in tokens_processed().items() if count > tokens_before.get(model, 0)
+    }
+    print(f"Processed meeting {meeting.pk}, tokens encoded per model: {tokens}")
@@ -1,3 +1,133 @@
-from django.test import TestCase
+import random
+from unittest import mock
+from django.test import SimpleTestCase
+from transcription.text import normalize_arabic, search_terms
+from transcription.utils import match_speakers_to_transcript, pack_pieces, split_pieces, split_strings
 
-# Create your tests here.
+
+def overlap(turn, segment):
+    _, start, end = turn
+    return min(end, segment['end']) - max(start, segment['start'])
+
+
+def best_overlap(speaker_segments, segment):
+    """Reference alignment: the largest overlap of any speaker turn with a segment."""
+    return max([overlap(turn, segment) for turn in speaker_segments] + [0.0])
+
+
+class CharacterEncoding:
+    """One token per character, so tests do not download a tiktoken vocabulary."""
+
+    def encode_ordinary(self, text):
+        return [ord(char) for char in text]
+
+    def encode_ordinary_batch(self, texts, num_threads=1):
+        return [self.encode_ordinary(text) for text in texts]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+class MatchSpeakersTests(SimpleTestCase):
+    def test_segment_goes_to_speaker_with_most_overlap(self):
+        turns = [("A", 0.0, 4.0), ("B", 3.0, 10.0)]
+        segments = [{"start": 2.0, "end": 6.0, "text": "hello"}]
+
+        aligned = match_speakers_to_transcript(turns, segments)
+
+        self.assertEqual(aligned, [{"start": 2.0, "end": 6.0, "text": "hello", "speaker": "B"}])
+
+    def test_segment_without_overlapping_turn_has_no_speaker(self):
+        turns = [("A", 0.0, 1.0), ("B", 5.0, 6.0)]
+        segments = [{"start": 1.0, "end": 5.0, "text": "silence"}]
+
+        aligned = match_speakers_to_transcript(turns, segments)
+
+        self.assertIsNone(aligned[0]["speaker"])
+
+    def test_matches_brute_force_on_random_meetings(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            turns = []
+            for _ in range(rng.randint(0, 12)):
+                start = round(rng.uniform(0, 60), 1)
+                turns.append((rng.choice("ABCD"), start, round(start + rng.uniform(0.1, 15), 1)))
+            segments = []
+            for i in range(rng.randint(0, 20)):
+                start = round(rng.uniform(0, 60), 1)
+                segments.append({"start": start, "end": round(start + rng.uniform(0.1, 8), 1), "text": str(i)})
+
+            aligned = match_speakers_to_transcript(turns, segments)
+
+            self.assertEqual([segment["text"] for segment in aligned], [
+                segment["text"] for segment in sorted(segments, key=lambda segment: segment['start'])
+            ])
+            for segment in aligned:
+                # Ties between turns may go either way; the overlap must be the best one
+                best = best_overlap(turns, segment)
+                if best > 0:
+                    speaker_overlap = max(overlap(turn, segment) for turn in turns if turn[0] == segment["speaker"])
+                    self.assertEqual(speaker_overlap, best)
+                else:
+                    self.assertIsNone(segment["speaker"])
+
+
+@mock.patch('transcription.tokenizer.get_encoding', return_value=CharacterEncoding())
+class SplitStringsTests(SimpleTestCase):
+    text = "\n\n".join(
+        "\n".join(". ".join(f"Sentence {p}.{l}.{n} about the budget" for n in range(4)) for l in range(3))
+        for p in range(5)
+    ) + " " + "x" * 250
+
+    def test_pieces_are_bounded_and_join_back(self, get_encoding):
+        pieces = split_pieces(self.text, 'gpt-4o-mini', max_tokens=60)
+
+        self.assertEqual("".join(piece for piece, _ in pieces), self.text)
+        for piece, count in pieces:
+            self.assertEqual(count, len(piece))
+            self.assertLessEqual(count, 60)
+
+    def test_chunks_are_bounded_and_keep_the_text(self, get_encoding):
+        pieces = split_pieces(self.text, 'gpt-4o-mini', max_tokens=100)
+
+        chunks = pack_pieces(pieces, max_tokens=100)
+
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertEqual("".join(chunks).replace(" ", "").replace("\n", ""), self.text.replace(" ", "").replace("\n", ""))
+
+    def test_overlap_repeats_the_end_of_the_previous_chunk(self, get_encoding):
+        words = [f"w{n:02}" for n in range(100)]
+
+        chunks = split_strings(" ".join(words), max_tokens=100, overlap=20)
+
+        self.assertGreater(len(chunks), 1)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertLessEqual(len(chunk), 100)
+            previous_words = previous.split()
+            repeated = previous_words[previous_words.index(chunk.split()[0]):]
+            self.assertTrue(repeated)
+            self.assertEqual(chunk.split()[:len(repeated)], repeated)
+            self.assertLessEqual(len(" ".join(repeated)), 20)
+        self.assertEqual(sorted(set(" ".join(chunks).split())), words)
+
+    def test_short_text_is_a_single_chunk(self, get_encoding):
+        self.assertEqual(split_strings("A short note.", max_tokens=100), ["A short note."])
+
+
+class ArabicSearchTextTests(SimpleTestCase):
+    def test_normalize_arabic_folds_variants(self):
+        self.assertEqual(normalize_arabic("إِدارة المشروعات"), "اداره المشروعات")
+        self.assertEqual(normalize_arabic("أُسبوعٌ ـــ مُستشفى"), "اسبوع  مستشفي")
+        self.assertEqual(normalize_arabic("آخر ٣ أيام"), "اخر 3 ايام")
+        self.assertEqual(normalize_arabic("Budget Review"), "budget review")
+
+    def test_spellings_of_a_word_normalize_alike(self):
+        self.assertEqual(normalize_arabic("مسؤولية"), normalize_arabic("مسوولية"))
+        self.assertEqual(normalize_arabic("الميزانيّة"), normalize_arabic("الميزانيه"))
+
+    def test_search_terms_drop_stopwords_short_words_and_duplicates(self):
+        self.assertEqual(search_terms("ماذا قررنا في اجتماع الميزانية؟ الميزانيه و 5"), ["قررنا", "اجتماع", "الميزانيه", "5"])
+        self.assertEqual(search_terms("What is the status of the Q3 budget?"), ["status", "q3", "budget"])
+
+    def test_search_terms_of_only_stopwords_is_empty(self):
+        self.assertEqual(search_terms("what did we do?"), [])
@@ -0,0 +1,39 @@
+import re
+
+
+# Harakat, Quranic marks and tatweel
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_FOLDS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+WORD = re.compile(r'\w+')
+
+# Question and function words that would match almost every chunk (normalized forms)
+STOPWORDS = {
+    'في', 'من', 'علي', 'الي', 'عن', 'مع', 'و', 'او', 'ان', 'لا', 'لم', 'لن', 'ما', 'ماذا', 'هل', 'كيف',
+    'متي', 'اين', 'كم', 'لماذا', 'هو', 'هي', 'هم', 'نحن', 'انا', 'هذا', 'هذه', 'ذلك', 'تلك', 'التي',
+    'الذي', 'الذين', 'كان', 'كانت', 'تم', 'قد', 'ثم', 'بعد', 'قبل', 'عند', 'كل', 'اي',
+    'the', 'a', 'an', 'of', 'in', 'on', 'to', 'and', 'or', 'is', 'are', 'was', 'what', 'how', 'when',
+    'who', 'did', 'do', 'we', 'about', 'for',
+}
+
+
+def normalize_arabic(text):
+    """
+    Normalize text for lexical search: strip diacritics and tatweel, fold alef,
+    yaa, hamza and taa marbuta variants, use Western digits and lowercase Latin.
+    """
+    return ARABIC_DIACRITICS.sub('', text).translate(ARABIC_FOLDS).lower()
+
+
+def search_terms(text):
+    """Return the distinct normalized words of a query that are worth matching on."""
+    terms = []
+    for word in WORD.findall(normalize_arabic(text)):
+        if word in STOPWORDS or (len(word) < 2 and not word.isdigit()) or word in terms:
+            continue
+        terms.append(word)
+    return terms
@@ -0,0 +1,64 @@
+import threading
+from collections import Counter
+from functools import lru_cache
+import tiktoken
+from django.conf import settings
+
+
+# Shared by the transcription and interface apps: one encoder per model and process,
+# and a running count of the tokens encoded through this module
+DEFAULT_MODEL = 'gpt-4o-mini'
+
+_tokens_processed = Counter()
+_counter_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = DEFAULT_MODEL) -> tiktoken.Encoding:
+    """Return the process-wide encoder for a model."""
+    return tiktoken.encoding_for_model(model)
+
+
+def _record(model: str, count: int):
+    with _counter_lock:
+        _tokens_processed[model] += count
+
+
+def encode(text: str, model: str = DEFAULT_MODEL) -> list[int]:
+    """Encode a string, treating special-token text as ordinary text."""
+    tokens = get_encoding(model).encode_ordinary(text)
+    _record(model, len(tokens))
+    return tokens
+
+
+def encode_batch(texts: list[str], model: str = DEFAULT_MODEL) -> list[list[int]]:
+    """Encode several strings at once on tiktoken's thread pool."""
+    batch = get_encoding(model).encode_ordinary_batch(texts, num_threads=settings.TOKENIZER_THREADS)
+    _record(model, sum(len(tokens) for tokens in batch))
+    return batch
+
+
+def decode(tokens: list[int], model: str = DEFAULT_MODEL) -> str:
+    """Decode tokens back into a string."""
+    return get_encoding(model).decode(tokens)
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Return the number of tokens in a string."""
+    return len(encode(text, model=model))
+
+
+def count_tokens_batch(texts: list[str], model: str = DEFAULT_MODEL) -> list[int]:
+    """Return the number of tokens in each string."""
+    return [len(tokens) for tokens in encode_batch(texts, model=model)]
+
+
+def tokens_processed() -> dict[str, int]:
+    """Return the number of tokens encoded by this process, per model."""
+    with _counter_lock:
+        return dict(_tokens_processed)
+
+
+def reset_tokens_processed():
+    with _counter_lock:
+        _tokens_processed.clear()
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MeetingFileUploadView, MeetingStatusView, ProjectViewSet, MeetingViewSet, ActionItemViewSet
+from .views import MeetingFileUploadView, MeetingStatusView, upload_meeting_file_async, ProjectViewSet, MeetingViewSet, ActionItemViewSet
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -13,5 +13,6 @@ router.register(r'action-items', ActionItemViewSet, basename='action-item')
 urlpatterns = [
     path('', include(router.urls)),
     path('upload/', MeetingFileUploadView.as_view(), name='file-upload'),
+    path('upload/async/', upload_meeting_file_async, name='file-upload-async'),
     path('status/<int:file_id>/', MeetingStatusView.as_view(), name='file-status'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,8 +1,18 @@
-from pyannote.audio import Pipeline
+import hashlib
+import heapq
+import json
+import math
 import os
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from openai import OpenAI
 import pandas as pd
-import tiktoken
+from .backends import get_transcription_backend
+from .tokenizer import count_tokens, count_tokens_batch, decode, encode
+from .audio import audio_duration, normalize_audio, split_audio_at_silence
+from .diarization import get_diarization_pipeline, resident_memory_mb
 
 
 def split_audio_by_speaker(audio_path, diarization_pipeline):
@@ -13,91 +23,219 @@ def split_audio_by_speaker(audio_path, diarization_pipeline):
     :param diarization_pipeline: Pre-loaded Pyannote pipeline for diarization.
     :return: List of (speaker, start_time, end_time).
     """
+    started = time.perf_counter()
     diarization_result = diarization_pipeline({'uri': 'audio', 'audio': audio_path})
     speaker_segments = []
 
     for segment, track, speaker in diarization_result.itertracks(yield_label=True):
         speaker_segments.append((speaker, segment.start, segment.end))
 
+    print(
+        f"Diarized {len(speaker_segments)} speaker turns in {time.perf_counter() - started:.1f}s "
+        f"(resident memory {resident_memory_mb():.0f} MB)"
+    )
     return speaker_segments
 
 
-def transcribe_audio(audio_path):
+def transcribe_audio(audio_path, chunked=None, backend=None):
     """
-    Perform speech-to-text transcription using OpenAI Whisper API.
+    Perform speech-to-text transcription with the configured transcription backend.
+
+    Long or large recordings are split at silence boundaries and the chunks are
+    transcribed as a batch, then stitched back with absolute timestamps.
 
     :param audio_path: Path to the audio file.
+    :param chunked: Force (True) or disable (False) chunking; by default chunk when the backend
+                    needs it and the file exceeds TRANSCRIPTION_CHUNK_MAX_BYTES or TRANSCRIPTION_CHUNK_MAX_SECONDS.
+    :param backend: TranscriptionBackend to use; defaults to the one selected by TRANSCRIPTION_BACKEND.
     :return: Transcription segments with timestamps.
     """
-
-    client = OpenAI()
-    with open(audio_path, "rb") as audio_file:
-        transcript = client.audio.transcriptions.create(
-    file=audio_file,
-    model="whisper-1",
-    response_format="verbose_json",
-    timestamp_granularities=["segment"]
-    )
-
-    # Process the response to extract segments and timestamps
-    transcription_segments = []
-    for segment in transcript.segments:
-        transcription_segments.append({
-            "start": segment.start,
-            "end": segment.end,
-            "text": segment.text
-        })
+    backend = backend or get_transcription_backend()
+    duration = audio_duration(audio_path)
+    started = time.perf_counter()
+
+    if chunked is None:
+        chunked = backend.chunked and (
+            os.path.getsize(audio_path) > settings.TRANSCRIPTION_CHUNK_MAX_BYTES
+            or (duration is not None and duration > settings.TRANSCRIPTION_CHUNK_MAX_SECONDS)
+        )
+
+    if not chunked:
+        transcription_segments = backend.transcribe(audio_path)
+    else:
+        with tempfile.TemporaryDirectory() as chunk_dir:
+            chunks = split_audio_at_silence(
+                audio_path,
+                chunk_dir,
+                max_chunk_seconds=settings.TRANSCRIPTION_CHUNK_MAX_SECONDS,
+                max_chunk_bytes=settings.TRANSCRIPTION_CHUNK_MAX_BYTES,
+                bitrate=settings.TRANSCRIPTION_AUDIO_BITRATE,
+            )
+            print(f"Transcribing {len(chunks)} chunks with the {backend.name} backend...")
+            results = backend.transcribe_batch(chunks)
+            transcription_segments = [segment for result in results for segment in result]
+
+    elapsed = time.perf_counter() - started
+    if duration:
+        # Throughput report, to compare backends under the same pipeline
+        speed = duration / elapsed
+        per_core = f", {speed / backend.cpu_threads:.2f}x per core" if backend.cpu_threads else ""
+        print(f"Transcribed {duration:.0f}s of audio in {elapsed:.1f}s with the {backend.name} backend "
+              f"({speed:.1f}x real time{per_core})")
 
     return transcription_segments
 
 
-def match_speakers_to_transcript(transcription_segments):
+def match_speakers_to_transcript(speaker_segments, transcription_segments):
     """
-    Match speakers to the transcript using timestamps.
+    Assign each transcription segment to the speaker whose turn overlaps it the most.
+
+    Speaker turns and segments are both swept in start order while a heap keeps the
+    turns that are still active, so alignment is O((n + m) log m) instead of n * m.
 
     :param speaker_segments: List of (speaker, start_time, end_time).
     :param transcription_segments: Transcription segments with timestamps.
-    :return: Combined transcript in "speaker: text" format.
+    :return: Segments sorted by start, each with an added "speaker" key (None if no turn overlaps).
     """
-    final_transcript = []
+    turns = sorted(speaker_segments, key=lambda turn: turn[1])
+    segments = sorted(transcription_segments, key=lambda segment: segment['start'])
+
+    aligned_segments = []
+    active = []  # heap of (end, start, speaker) for turns that may still overlap
+    next_turn = 0
+    for segment in segments:
+        # Activate every turn that starts before this segment ends
+        while next_turn < len(turns) and turns[next_turn][1] < segment['end']:
+            speaker, start, end = turns[next_turn]
+            heapq.heappush(active, (end, start, speaker))
+            next_turn += 1
+        # Retire turns that ended before this segment starts; later segments start later
+        while active and active[0][0] <= segment['start']:
+            heapq.heappop(active)
+
+        best_speaker, best_overlap = None, 0.0
+        for end, start, speaker in active:
+            overlap = min(end, segment['end']) - max(start, segment['start'])
+            if overlap > best_overlap:
+                best_speaker, best_overlap = speaker, overlap
+
+        aligned_segments.append({**segment, "speaker": best_speaker})
+
+    return aligned_segments
+
+
+def format_speaker_transcript(aligned_segments):
+    """
+    Render speaker-attributed segments as a transcript in "speaker: text" format,
+    merging consecutive segments from the same speaker.
 
-    for speaker, start, end in speaker_segments:
-        speaker_text = []
+    :param aligned_segments: Output of match_speakers_to_transcript.
+    :return: Combined transcript.
+    """
+    final_transcript = []
+    current_speaker, speaker_text = None, []
 
-        for segment in transcription_segments:
-            # Check if the transcription segment is within the speaker's time range
-            if start <= segment['start'] <= end or start <= segment['end'] <= end:
-                speaker_text.append(segment['text'])
+    for segment in aligned_segments:
+        speaker = segment['speaker'] or "UNKNOWN"
+        if speaker != current_speaker and speaker_text:
+            final_transcript.append(f"{current_speaker}: {' '.join(speaker_text)}")
+            speaker_text = []
+        current_speaker = speaker
+        speaker_text.append(segment['text'].strip())
 
-        # Join speaker text into one chunk
-        if speaker_text:
-            combined_text = " ".join(speaker_text)
-            final_transcript.append(f"{speaker}: {combined_text}")
+    if speaker_text:
+        final_transcript.append(f"{current_speaker}: {' '.join(speaker_text)}")
 
     return "\n".join(final_transcript)
 
 
-def transcription_pipeline(audio_path):
-    # Load the diarization pipeline
-    # diarization_pipeline = Pipeline.from_pretrained('pyannote/speaker-diarization')
-
-    # Step 1: Perform speaker diarization
-    print("Performing speaker diarization...")
-    # speaker_segments = split_audio_by_speaker(audio_path, diarization_pipeline)
+def transcribe_segments(audio_path):
+    """
+    Run normalization, optional diarization and transcription on a recording.
 
-    # Step 2: Perform speech-to-text transcription
-    print("Transcribing audio...")
-    transcription_segments = transcribe_audio(audio_path)
+    :param audio_path: Path to the audio file.
+    :return: Transcription segments, each with a "speaker" key when diarization is enabled.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Step 0: Downmix, resample and compress the recording before it is uploaded
+        if settings.TRANSCRIPTION_NORMALIZE_AUDIO:
+            print("Normalizing audio...")
+            audio_path = normalize_audio(
+                audio_path,
+                os.path.join(work_dir, "normalized.ogg"),
+                sample_rate=settings.TRANSCRIPTION_SAMPLE_RATE,
+                bitrate=settings.TRANSCRIPTION_AUDIO_BITRATE,
+            )
+
+        # Step 1: Perform speaker diarization
+        speaker_segments = None
+        if settings.TRANSCRIPTION_DIARIZATION_ENABLED:
+            print("Performing speaker diarization...")
+            speaker_segments = split_audio_by_speaker(audio_path, get_diarization_pipeline())
+
+        # Step 2: Perform speech-to-text transcription
+        print("Transcribing audio...")
+        transcription_segments = transcribe_audio(audio_path)
+
+    if speaker_segments is None:
+        return transcription_segments
 
     # Step 3: Match speakers with transcript
     print("Matching speakers with transcript...")
-    # return the final transcript
-    return " \n ".join([seg['text'] for seg in transcription_segments])
+    return match_speakers_to_transcript(speaker_segments, transcription_segments)
 
 
-def summarize(content, project=None):
-    client = OpenAI()
-    
+def format_transcript(segments):
+    """Render transcription segments as transcript text, with speaker labels when present."""
+    if any('speaker' in segment for segment in segments):
+        return format_speaker_transcript(segments)
+    return " \n ".join([seg['text'] for seg in segments])
+
+
+def transcription_pipeline(audio_path):
+    return format_transcript(transcribe_segments(audio_path))
+
+
+# Bump when the summarization prompt changes, so cached summaries are not reused
+SUMMARY_MODEL = "gpt-4"
+SUMMARY_PROMPT_VERSION = 1
+EMBEDDING_MODEL = "text-embedding-3-small"
+CHUNK_MAX_TOKENS = 1600
+CHUNK_OVERLAP_TOKENS = 0
+# Bump when split_pieces/pack_pieces change how text is cut, so cached chunks are not reused
+CHUNK_SPLITTER_VERSION = 1
+
+
+def transcription_version():
+    """Version string of the transcript stage, covering every setting that changes its output."""
+    return (
+        f"{settings.TRANSCRIPTION_BACKEND}"
+        f":diarization={settings.TRANSCRIPTION_DIARIZATION_ENABLED}"
+        f":normalize={settings.TRANSCRIPTION_NORMALIZE_AUDIO}"
+        f":audio={settings.TRANSCRIPTION_SAMPLE_RATE}Hz/{settings.TRANSCRIPTION_AUDIO_BITRATE}"
+        f":whisper={settings.LOCAL_WHISPER_MODEL}/{settings.LOCAL_WHISPER_COMPUTE_TYPE}"
+    )
+
+
+def summary_version(project=None):
+    """
+    Version string of the summary stage: the model, the prompt version, and a hash of the
+    system prompt, which covers the project details (title, description, team, dates) in it.
+    """
+    prompt_hash = hashlib.sha256(summary_system_prompt(project).encode('utf-8')).hexdigest()[:16]
+    return f"{SUMMARY_MODEL}:v{SUMMARY_PROMPT_VERSION}:prompt={prompt_hash}"
+
+
+def chunk_version():
+    """Version string of the chunk stage, covering the splitter and the embedding settings."""
+    return (
+        f"{EMBEDDING_MODEL}:{settings.EMBEDDING_DIMENSIONS}"
+        f":chunks={CHUNK_MAX_TOKENS}/{CHUNK_OVERLAP_TOKENS}:splitter=v{CHUNK_SPLITTER_VERSION}"
+    )
+
+
+def summary_system_prompt(project=None):
+    """Build the system prompt that turns a transcript into structured minutes plus a JSON block."""
     # Build project details string if project exists
     project_details = ""
     if project:
@@ -109,11 +247,8 @@ Project Information:
 - Start Date: {project.start_date}
 - End Date: {project.end_date}
 """
-    
-    completion = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": f"""You are responsible for documenting meetings. You will be given a transcript for a meeting and project details, and you should write a structured minutes of meeting. Please include the following information in your report, if any information is not available, write "Not mentioned":
+
+    return f"""You are responsible for documenting meetings. You will be given a transcript for a meeting and project details, and you should write a structured minutes of meeting. Please include the following information in your report, if any information is not available, write "Not mentioned":
 
 {project_details}
 1. Related Project: (Use the project information provided above)
@@ -133,27 +268,40 @@ After the meeting minutes, include a JSON object with the following structure th
 }}
 
 Please maintain this exact structure in your response.
-The report should be clear and professional. Meetings and reports are in Arabic. Write everythin in Arabic"""},
-            {
-                "role": "user",
-                "content": content
-            }
-        ]
-    )
-    summary = completion.choices[0].message.content
-    
-    # Extract meeting name and action items from the summary
+The report should be clear and professional. Meetings and reports are in Arabic. Write everythin in Arabic"""
+
+
+CHUNK_SUMMARY_PROMPT = """You are responsible for documenting meetings. You will be given one consecutive part of a longer meeting transcript. Write detailed notes of everything discussed in this part, keeping names, numbers, dates, decisions and who said what. Do not write an introduction or a conclusion.
+
+After the notes, include a JSON object with any action items, tasks, or next steps mentioned in this part:
+{
+    "action_items": [
+        {
+            "text": "The action item text"
+        }
+    ]
+}
+
+Meetings and notes are in Arabic. Write everything in Arabic"""
+
+
+def parse_summary(summary):
+    """
+    Separate the minutes from the trailing JSON block of a summary completion.
+
+    :return: (meeting_minutes, meeting_name, action_items). If the JSON cannot be parsed,
+             the whole completion is kept as the minutes.
+    """
     meeting_name = "Untitled Meeting"
     action_items = []
-    
+
     # Split the summary to separate the meeting minutes from the JSON
     parts = summary.split('{')
     meeting_minutes = parts[0].strip()
     json_part = '{' + '{'.join(parts[1:]) if len(parts) > 1 else None
-    
+
     if json_part:
         try:
-            import json
             data = json.loads(json_part)
             meeting_name = data.get('meeting_title', meeting_name)
             action_items = data.get('action_items', [])
@@ -163,14 +311,97 @@ The report should be clear and professional. Meetings and reports are in Arabic.
             print("Failed to parse JSON from summary, keeping it in the meeting minutes")
             # If JSON parsing fails, return the entire summary including the JSON
             return summary, meeting_name, action_items
-    
+
     return meeting_minutes, meeting_name, action_items
 
 
-def num_tokens(text: str, model: str = 'gpt-4o-mini') -> int:
-    """Return the number of tokens in a string."""
-    encoding = tiktoken.encoding_for_model(model)
-    return len(encoding.encode(text))
+def summarize_chunks(client, chunks):
+    """
+    Map step: summarize consecutive transcript chunks concurrently.
+
+    :return: (notes, action_items) with one notes string per chunk, in order, and the
+             action items found across all chunks.
+    """
+    def summarize_chunk(chunk):
+        completion = client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": CHUNK_SUMMARY_PROMPT},
+                {"role": "user", "content": chunk}
+            ]
+        )
+        notes, _, chunk_action_items = parse_summary(completion.choices[0].message.content)
+        return notes, chunk_action_items
+
+    with ThreadPoolExecutor(max_workers=settings.SUMMARY_MAX_WORKERS) as executor:
+        results = list(executor.map(summarize_chunk, chunks))
+
+    notes = [chunk_notes for chunk_notes, _ in results]
+    action_items = [item for _, chunk_action_items in results for item in chunk_action_items]
+    return notes, action_items
+
+
+def summarize(content, project=None, on_progress=None):
+    """
+    Write the minutes of a meeting from its transcript.
+
+    Transcripts longer than SUMMARY_CHUNK_TOKENS are summarized hierarchically: chunks
+    are summarized concurrently (map), and the notes are merged by a final pass (reduce).
+    The final pass is streamed and the minutes written so far are passed to on_progress
+    every SUMMARY_PROGRESS_FLUSH_TOKENS tokens.
+
+    :return: (meeting_minutes, meeting_name, action_items).
+    """
+    client = OpenAI()
+
+    candidate_action_items = []
+    level = 0
+    # Budgets are counted with the summary model's own encoder, which may split Arabic
+    # into many more tokens than the default one
+    while count_tokens(content, model=SUMMARY_MODEL) > settings.SUMMARY_CHUNK_TOKENS and level < settings.SUMMARY_MAX_LEVELS:
+        chunks = split_strings(content, max_tokens=settings.SUMMARY_CHUNK_TOKENS, model=SUMMARY_MODEL)
+        print(f"Summarizing {len(chunks)} transcript chunks (level {level})...")
+        notes, action_items = summarize_chunks(client, chunks)
+        candidate_action_items.extend(action_items)
+        content = "\n\n".join(notes)
+        level += 1
+
+    if level:
+        # Reduce step: the notes stand in for the transcript, and the chunk action items are merged
+        content = (
+            "The following are consecutive notes covering the whole meeting, in order.\n\n"
+            f"{content}\n\n"
+            "Action items found in the notes (merge duplicates in your JSON):\n"
+            f"{json.dumps(candidate_action_items, ensure_ascii=False)}"
+        )
+
+    stream = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": summary_system_prompt(project)},
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+        stream=True
+    )
+
+    parts = []
+    pending = 0
+    for chunk in stream:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        parts.append(chunk.choices[0].delta.content)
+        pending += 1
+        # Each streamed delta is roughly one token
+        if on_progress and pending >= settings.SUMMARY_PROGRESS_FLUSH_TOKENS:
+            # Only the minutes are shown while writing; the JSON block is parsed at the end
+            on_progress("".join(parts).split('{')[0])
+            pending = 0
+    summary = "".join(parts)
+
+    return parse_summary(summary)
 
 
 def read_txt_files(file_paths):
@@ -193,30 +424,6 @@ def read_txt_files(file_paths):
     return file_contents
 
 
-def halved_by_delimiter(string: str, delimiter: str = "\n") -> list[str, str]:
-    """Split a string in two, on a delimiter, trying to balance tokens on each side."""
-    chunks = string.split(delimiter)
-    if len(chunks) == 1:
-        return [string, ""]  # no delimiter found
-    elif len(chunks) == 2:
-        return chunks  # no need to search for halfway point
-    else:
-        total_tokens = num_tokens(string)
-        halfway = total_tokens // 2
-        best_diff = halfway
-        for i, chunk in enumerate(chunks):
-            left = delimiter.join(chunks[: i + 1])
-            left_tokens = num_tokens(left)
-            diff = abs(halfway - left_tokens)
-            if diff >= best_diff:
-                break
-            else:
-                best_diff = diff
-        left = delimiter.join(chunks[:i])
-        right = delimiter.join(chunks[i:])
-        return [left, right]
-
-
 def truncated_string(
     string: str,
     model: str,
@@ -224,64 +431,107 @@ def truncated_string(
     print_warning: bool = True,
 ) -> str:
     """Truncate a string to a maximum number of tokens."""
-    encoding = tiktoken.encoding_for_model(model)
-    encoded_string = encoding.encode(string)
-    truncated_string = encoding.decode(encoded_string[:max_tokens])
+    encoded_string = encode(string, model=model)
+    truncated_string = decode(encoded_string[:max_tokens], model=model)
     if print_warning and len(encoded_string) > max_tokens:
         print(f"Warning: Truncated string from {len(encoded_string)} tokens to {max_tokens} tokens.")
     return truncated_string
 
 
+# Delimiters tried in order, from paragraph breaks down to single words
+SPLIT_DELIMITERS = ["\n\n", "\n", ". ", " "]
+
+
+def split_pieces(string: str, model: str, max_tokens: int, delimiters: list[str] = SPLIT_DELIMITERS) -> list[tuple[str, int]]:
+    """
+    Cut a string at the coarsest delimiter into pieces of at most max_tokens each.
+
+    Every piece is encoded once, in a batch; only pieces that are still too long are
+    cut again with the next delimiter, and as a last resort split on token boundaries.
+    Delimiters stay attached to the piece on their left, so the pieces join back into the string.
+
+    :return: List of (piece, token_count).
+    """
+    if not delimiters:
+        tokens = encode(string, model=model)
+        return [
+            (decode(tokens[start:start + max_tokens], model=model), len(tokens[start:start + max_tokens]))
+            for start in range(0, len(tokens), max_tokens)
+        ]
+
+    delimiter = delimiters[0]
+    parts = string.split(delimiter)
+    pieces = [part + delimiter for part in parts[:-1]] + parts[-1:]
+    pieces = [piece for piece in pieces if piece]
+    counts = count_tokens_batch(pieces, model=model)
+
+    result = []
+    for piece, count in zip(pieces, counts):
+        if count <= max_tokens:
+            result.append((piece, count))
+        else:
+            result.extend(split_pieces(piece, model, max_tokens, delimiters[1:]))
+    return result
+
+
+def pack_pieces(pieces: list[tuple[str, int]], max_tokens: int, overlap: int = 0) -> list[str]:
+    """
+    Group consecutive (piece, token_count) pairs into balanced chunks of at most max_tokens.
+
+    Chunks aim at an equal share of the total tokens rather than filling up to the
+    limit, so the last chunk is not a small remainder. With overlap, each chunk starts
+    with up to that many trailing tokens of the previous chunk.
+    """
+    total_tokens = sum(count for _, count in pieces)
+    target = total_tokens / max(1, math.ceil(total_tokens / max_tokens))
+
+    chunks = []
+    current, current_tokens, fresh_tokens = [], 0, 0
+    for piece, count in pieces:
+        # Cut when the piece does not fit, or when adding it moves further from the target size
+        if fresh_tokens and (current_tokens + count > max_tokens or fresh_tokens + count / 2 > target):
+            chunks.append("".join(text for text, _ in current).strip())
+            tail, tail_tokens = [], 0
+            for text, tokens in reversed(current):
+                if tail_tokens + tokens > overlap:
+                    break
+                tail.insert(0, (text, tokens))
+                tail_tokens += tokens
+            if tail_tokens + count > max_tokens:
+                tail, tail_tokens = [], 0
+            current, current_tokens, fresh_tokens = tail, tail_tokens, 0
+        current.append((piece, count))
+        current_tokens += count
+        fresh_tokens += count
+
+    if current:
+        chunks.append("".join(text for text, _ in current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
 def split_strings(
-    string: tuple[list[str], str],
+    string: str,
     max_tokens: int = 1000,
     model: str = 'gpt-4o-mini',
-    max_recursion: int = 5,
+    overlap: int = 0,
 ) -> list[str]:
     """
-    Split a subsection into a list of subsections, each with no more than max_tokens.
-    Each subsection is a tuple of parent titles [H1, H2, ...] and text (str).
-    """
+    Split a string into balanced chunks of no more than max_tokens, in a single pass.
+
+    The text is tokenized once (piece by piece) and chunk boundaries are chosen from the
+    running token counts at delimiter positions, so the cost is linear in the text length.
 
-    num_tokens_in_string = num_tokens(string)
-    # if length is fine, return string
-    if num_tokens_in_string <= max_tokens:
+    :param overlap: Number of tokens from the end of each chunk repeated at the start of the next.
+    """
+    pieces = split_pieces(string, model, max_tokens)
+    if sum(count for _, count in pieces) <= max_tokens:
         return [string]
-    # if recursion hasn't found a split after X iterations, just truncate
-    elif max_recursion == 0:
-        return [truncated_string(string, model=model, max_tokens=max_tokens)]
-    # otherwise, split in half and recurse
-    else:
-        for delimiter in ["\n\n", "\n", ". "]:
-            left, right = halved_by_delimiter(string, delimiter=delimiter)
-            if left == "" or right == "":
-                # if either half is empty, retry with a more fine-grained delimiter
-                continue
-            else:
-                # recurse on each half
-                results = []
-                for half in [left, right]:
-                    half_strings = split_strings(
-                        half,
-                        max_tokens=max_tokens,
-                        model=model,
-                        max_recursion=max_recursion - 1,
-                    )
-                    results.extend(half_strings)
-                return results
-    # otherwise no split was found, so just truncate (should be very rare)
-    return [truncated_string(string, model=model, max_tokens=max_tokens)]
+    return pack_pieces(pieces, max_tokens, overlap=overlap)
 
 
-def embedding_pipeline(content):
+def embed_strings(strings):
+    """Embed a list of strings in batches, returning one vector per string in input order."""
     client = OpenAI()
-    MAX_TOKENS = 1600
-
-    strings = split_strings(content, max_tokens=MAX_TOKENS)
-
-    print(f"split into {len(strings)} strings.")
-
-    EMBEDDING_MODEL = "text-embedding-3-small"
     BATCH_SIZE = 1000  # you can submit up to 2048 embedding inputs per request
 
     embeddings = []
@@ -289,19 +539,50 @@ def embedding_pipeline(content):
         batch_end = batch_start + BATCH_SIZE
         batch = strings[batch_start:batch_end]
         print(f"Batch {batch_start} to {batch_end - 1}")
-        response = client.embeddings.create(model=EMBEDDING_MODEL, input=batch)
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL, input=batch, dimensions=settings.EMBEDDING_DIMENSIONS,
+        )
         for i, be in enumerate(response.data):
             assert i == be.index  # double check embeddings are in same order as input
         batch_embeddings = [e.embedding for e in response.data]
         embeddings.extend(batch_embeddings)
 
+    return embeddings
 
-    # df = pd.DataFrame({"text": strings, "embedding": embeddings})
-    #
-    # SAVE_PATH = "data/meeting.csv"
-    #
-    # df.to_csv(SAVE_PATH, index=False)
 
-    return embeddings[0]
+def chunk_embedding_pipeline(content):
+    """
+    Split a transcript into token-bounded chunks and embed every chunk.
+
+    :param content: Transcript text.
+    :return: List of {"index", "text", "token_count", "start_offset", "end_offset", "embedding"}
+             dicts, offsets being character positions in content.
+    """
+    strings = split_strings(content, max_tokens=CHUNK_MAX_TOKENS, overlap=CHUNK_OVERLAP_TOKENS)
+    print(f"split into {len(strings)} strings.")
+    embeddings = embed_strings(strings)
+    token_counts = count_tokens_batch(strings)
+
+    chunks = []
+    cursor = 0
+    for index, (text, embedding, token_count) in enumerate(zip(strings, embeddings, token_counts)):
+        start_offset = content.find(text, cursor)
+        if start_offset == -1:
+            start_offset = cursor
+        end_offset = start_offset + len(text)
+        cursor = end_offset
+        chunks.append({
+            "index": index,
+            "text": text,
+            "token_count": token_count,
+            "start_offset": start_offset,
+            "end_offset": end_offset,
+            "embedding": embedding,
+        })
+    return chunks
 
 
+def embedding_pipeline(content):
+    """Return a single vector for content, the embedding of its first chunk."""
+    strings = split_strings(content, max_tokens=CHUNK_MAX_TOKENS)
+    return embed_strings(strings[:1])[0]
@@ -0,0 +1,8 @@
+from django.db.models import Func
+from pgvector.django import BitField
+
+
+class BinaryQuantize(Func):
+    """pgvector's binary_quantize(): one bit per dimension, set where the component is positive."""
+    function = 'binary_quantize'
+    output_field = BitField()
@@ -1,3 +1,7 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import viewsets, status, serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -14,6 +18,22 @@ from .serializers import (
     ActionItemCreateUpdateSerializer
 )
 from .tasks import process_meeting_uploaded_file
+from .cache import file_sha256
+from authentication.decorators import async_token_required
+
+
+def create_uploaded_meeting(file, project):
+    """Create a pending meeting for an uploaded file and queue its processing."""
+    meeting = Meeting.objects.create(
+        audio_file=file,
+        audio_hash=file_sha256(file),
+        status='pending',
+        project=project
+    )
+    
+    # Start processing
+    process_meeting_uploaded_file.delay(meeting.id)
+    return meeting
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -46,7 +66,8 @@ class MeetingViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'put', 'patch', 'delete', 'head', 'options']  # Exclude 'post'
     
     def get_queryset(self):
-        queryset = Meeting.objects.filter(project__team_account=self.request.user.team)
+        # Checkpoints are only read by the processing task
+        queryset = Meeting.objects.filter(project__team_account=self.request.user.team).defer('pipeline_checkpoints')
         
         # Filter by project_id if provided
         project_id = self.request.query_params.get('project_id', None)
@@ -104,14 +125,7 @@ class MeetingFileUploadView(APIView):
             )
 
         # Create meeting with project
-        meeting = Meeting.objects.create(
-            audio_file=file,
-            status='pending',
-            project=project
-        )
-        
-        # Start processing
-        process_meeting_uploaded_file.delay(meeting.id)
+        meeting = create_uploaded_meeting(file, project)
         
         return Response({
             "message": "Meeting file uploaded and processing started.",
@@ -119,6 +133,43 @@ class MeetingFileUploadView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+@csrf_exempt
+@require_POST
+@async_token_required
+async def upload_meeting_file_async(request):
+    """
+    Async version of MeetingFileUploadView for ASGI servers.
+
+    Multipart parsing, hashing, storage and queueing are blocking, so they run in a
+    worker thread while the event loop keeps serving other requests.
+    """
+    files, data = await sync_to_async(lambda: (request.FILES, request.POST))()
+    file = files.get('file')
+    project_id = data.get('project')
+
+    if not file:
+        return JsonResponse({"error": "No file provided."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not project_id:
+        return JsonResponse({"error": "Project ID is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Verify project belongs to user's team
+    try:
+        project = await Project.objects.aget(id=project_id, team_account=request.user.team_id)
+    except (Project.DoesNotExist, ValueError):
+        return JsonResponse(
+            {"error": "Project not found or not accessible."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    meeting = await sync_to_async(create_uploaded_meeting)(file, project)
+
+    return JsonResponse({
+        "message": "Meeting file uploaded and processing started.",
+        "meeting_id": meeting.id
+    }, status=status.HTTP_201_CREATED)
+
+
 class MeetingStatusView(APIView):
     """
     View for checking meeting processing status.
@@ -128,7 +179,7 @@ class MeetingStatusView(APIView):
 
     def get(self, request, file_id):
         try:
-            meeting = Meeting.objects.get(
+            meeting = Meeting.objects.defer('pipeline_checkpoints').get(
                 id=file_id,
                 project__team_account=request.user.team
             )